@@ -30,6 +30,88 @@ GITHUB_CLIENT_ID = env("GITHUB_CLIENT_ID")
 GITHUB_CLIENT_SECRET = env("GITHUB_CLIENT_SECRET")
 GITHUB_BASE_URL = env("GITHUB_BASE_URL", default="https://api.github.com")
 
+# Secret configured on the GitHub webhook; deliveries whose
+# X-Hub-Signature-256 does not match it are rejected.
+GITHUB_WEBHOOK_SECRET = env("GITHUB_WEBHOOK_SECRET", default="")
+
+# Commit sync concurrency: repositories in flight per profile, and the cap
+# across all profiles handled by one worker process.
+GITHUB_SYNC_REPO_CONCURRENCY = env.int("GITHUB_SYNC_REPO_CONCURRENCY", default=8)
+GITHUB_SYNC_GLOBAL_CONCURRENCY = env.int("GITHUB_SYNC_GLOBAL_CONCURRENCY", default=32)
+
+# Fetch engine used by full syncs: "rest" or "graphql". The GraphQL engine
+# pulls repositories with their recent history in batched requests.
+GITHUB_SYNC_ENGINE = env("GITHUB_SYNC_ENGINE", default="rest")
+GITHUB_GRAPHQL_URL = env("GITHUB_GRAPHQL_URL", default=f"{GITHUB_BASE_URL}/graphql")
+GITHUB_GRAPHQL_REPOS_PER_PAGE = env.int("GITHUB_GRAPHQL_REPOS_PER_PAGE", default=25)
+GITHUB_GRAPHQL_COMMITS_PER_REPO = env.int("GITHUB_GRAPHQL_COMMITS_PER_REPO", default=50)
+
+# Sync scheduler: profiles claimed per batch, extra random delay added to a
+# profile's next sync as a fraction of its interval, and the window in
+# seconds over which the start of a claimed batch is spread.
+GITHUB_SCHEDULER_BATCH_SIZE = env.int("GITHUB_SCHEDULER_BATCH_SIZE", default=200)
+GITHUB_SCHEDULER_JITTER = env.float("GITHUB_SCHEDULER_JITTER", default=0.1)
+GITHUB_SCHEDULER_SPREAD = env.int("GITHUB_SCHEDULER_SPREAD", default=300)
+
+# Seconds between background checks of a profile's GitHub token, and how long
+# the permission check caches a user's token validity.
+GITHUB_TOKEN_CHECK_INTERVAL = env.int(
+    "GITHUB_TOKEN_CHECK_INTERVAL", default=6 * 60 * 60
+)
+GITHUB_TOKEN_VALID_CACHE_TTL = env.int("GITHUB_TOKEN_VALID_CACHE_TTL", default=300)
+
+# Seconds a sync job holds its profile's single-flight lease. Requests for the
+# same profile made meanwhile reuse the job or queue one follow-up.
+GITHUB_SYNC_LEASE_TTL = env.int("GITHUB_SYNC_LEASE_TTL", default=60 * 60)
+
+# Retention of sync logs, applied by the prune_sync_logs command: logs older
+# than the age limit are deleted, as are all but the newest ones per profile.
+GITHUB_SYNC_LOG_RETENTION_DAYS = env.int("GITHUB_SYNC_LOG_RETENTION_DAYS", default=90)
+GITHUB_SYNC_LOG_KEEP_PER_PROFILE = env.int(
+    "GITHUB_SYNC_LOG_KEEP_PER_PROFILE", default=200
+)
+
+# Rows per INSERT .. ON CONFLICT statement when persisting synced data, and
+# how many fetched pages may wait for the database before fetching pauses.
+GITHUB_SYNC_BATCH_SIZE = env.int("GITHUB_SYNC_BATCH_SIZE", default=500)
+GITHUB_SYNC_PIPELINE_DEPTH = env.int("GITHUB_SYNC_PIPELINE_DEPTH", default=2)
+
+# Pooled HTTP client shared by all GitHub API calls of a worker. HTTP/2 needs
+# the optional 'h2' package (httpx[http2]); without it HTTP/1.1 is used.
+GITHUB_HTTP2 = env.bool("GITHUB_HTTP2", default=False)
+GITHUB_HTTP_CONNECT_TIMEOUT = env.float("GITHUB_HTTP_CONNECT_TIMEOUT", default=5.0)
+GITHUB_HTTP_READ_TIMEOUT = env.float("GITHUB_HTTP_READ_TIMEOUT", default=30.0)
+GITHUB_HTTP_POOL_TIMEOUT = env.float("GITHUB_HTTP_POOL_TIMEOUT", default=10.0)
+GITHUB_HTTP_MAX_CONNECTIONS = env.int("GITHUB_HTTP_MAX_CONNECTIONS", default=100)
+GITHUB_HTTP_MAX_KEEPALIVE_CONNECTIONS = env.int(
+    "GITHUB_HTTP_MAX_KEEPALIVE_CONNECTIONS", default=20
+)
+GITHUB_HTTP_KEEPALIVE_EXPIRY = env.float("GITHUB_HTTP_KEEPALIVE_EXPIRY", default=30.0)
+
+# Pages of one listing requested ahead of time once its last page is known.
+GITHUB_PAGE_FETCH_CONCURRENCY = env.int("GITHUB_PAGE_FETCH_CONCURRENCY", default=4)
+
+# Per-token rate-limit governor: requests always left in reserve, fraction of
+# the limit below which requests are paced until reset, and longest
+# acceptable wait in seconds.
+GITHUB_RATE_LIMIT_RESERVE = env.int("GITHUB_RATE_LIMIT_RESERVE", default=50)
+GITHUB_RATE_LIMIT_PACE_BELOW = env.float("GITHUB_RATE_LIMIT_PACE_BELOW", default=0.2)
+GITHUB_RATE_LIMIT_MAX_WAIT = env.int("GITHUB_RATE_LIMIT_MAX_WAIT", default=900)
+
+# Retries of transient GitHub failures: attempts per request, backoff base and
+# cap in seconds, and total retries one sync may spend.
+GITHUB_RETRY_MAX_ATTEMPTS = env.int("GITHUB_RETRY_MAX_ATTEMPTS", default=5)
+GITHUB_RETRY_BASE_DELAY = env.float("GITHUB_RETRY_BASE_DELAY", default=1.0)
+GITHUB_RETRY_MAX_DELAY = env.float("GITHUB_RETRY_MAX_DELAY", default=60.0)
+GITHUB_RETRY_BUDGET = env.int("GITHUB_RETRY_BUDGET", default=100)
+
+# ETag / Last-Modified validators for conditional GitHub requests.
+# GITHUB_VALIDATOR_STORE is "cache", "database" or "none".
+GITHUB_VALIDATOR_STORE = env("GITHUB_VALIDATOR_STORE", default="cache")
+GITHUB_VALIDATOR_CACHE_ALIAS = env("GITHUB_VALIDATOR_CACHE_ALIAS", default="default")
+GITHUB_VALIDATOR_TTL = env.int("GITHUB_VALIDATOR_TTL", default=60 * 60 * 24 * 7)
+GITHUB_VALIDATOR_MAX_ENTRIES = env.int("GITHUB_VALIDATOR_MAX_ENTRIES", default=100_000)
+
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = env.bool("DEBUG", default=True)
@@ -67,6 +149,14 @@ LOGGING = {
             "handlers": ["console"],
             "level": "DEBUG",
         },
+        "github_integration": {
+            "handlers": ["console", "file"],
+            "level": "INFO",
+        },
+        "core": {
+            "handlers": ["console", "file"],
+            "level": "INFO",
+        },
     },
     "root": {
         "handlers": ["console"],
@@ -108,11 +198,13 @@ INSTALLED_APPS = [
     "github_integration.apps.GithubIntegrationConfig",
     "themes.apps.ThemesConfig",
     "dashboard.apps.DashboardConfig",
+    "core.apps.CoreConfig",
 ]
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "portfolios.middleware.CustomDomainMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -122,11 +214,65 @@ MIDDLEWARE = [
     "allauth.account.middleware.AccountMiddleware",
 ]
 
+# Cache-Control of the public portfolio endpoint: seconds a CDN or browser may
+# serve it as fresh, then keep serving it while revalidating in the background.
+PUBLIC_PORTFOLIO_MAX_AGE = env.int("PUBLIC_PORTFOLIO_MAX_AGE", default=60)
+PUBLIC_PORTFOLIO_STALE_WHILE_REVALIDATE = env.int(
+    "PUBLIC_PORTFOLIO_STALE_WHILE_REVALIDATE", default=600
+)
+
+# Custom-domain routing: seconds between checks for a changed domain map, and
+# the most domains a process keeps in memory.
+CUSTOM_DOMAIN_CHECK_INTERVAL = env.int("CUSTOM_DOMAIN_CHECK_INTERVAL", default=5)
+CUSTOM_DOMAIN_MAX_ENTRIES = env.int("CUSTOM_DOMAIN_MAX_ENTRIES", default=100_000)
+
+# Every cache read goes through core.cache.TieredCache: a small per-process
+# LRU in front of the "shared" cache. That is Redis when REDIS_URL is set and a
+# per-process LocMemCache otherwise (local development and tests).
+REDIS_URL = env("REDIS_URL", default="")
+
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        "LOCATION": "unique-snowflake",
-    }
+        "BACKEND": "core.cache.TieredCache",
+        "OPTIONS": {
+            "L2": "shared",
+            "L1_MAX_ENTRIES": env.int("CACHE_L1_MAX_ENTRIES", default=1024),
+            "L1_TIMEOUT": env.int("CACHE_L1_TIMEOUT", default=5),
+            "STATS_INTERVAL": env.int("CACHE_STATS_INTERVAL", default=300),
+            "NAMESPACES": {
+                "github_token_valid": {
+                    "prefix": "github_token_valid:",
+                    "timeout": GITHUB_TOKEN_VALID_CACHE_TTL,
+                },
+                "portfolio_snapshot": {
+                    "prefix": "portfolio_snapshot:",
+                    "timeout": 60 * 60 * 24,
+                },
+                "portfolio_slug": {"prefix": "portfolio_slug:", "timeout": 60 * 60},
+                "dashboard_stats": {"prefix": "dashboard_stats:", "timeout": 60 * 10},
+                # Checked on an interval by each process; L1 would only add lag.
+                "custom_domains": {"prefix": "custom_domains:", "l1": False},
+                # Many entries, each read about once per sync.
+                "github_validator": {"prefix": "github_validator:", "l1": False},
+                # Throttle histories are read-modify-write; a stale local copy
+                # would drop other workers' requests from the count.
+                "throttle": {"prefix": "throttle_", "l1": False},
+            },
+        },
+    },
+    "shared": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "devsync",
+            "VERSION": env.int("CACHE_VERSION", default=1),
+        }
+        if REDIS_URL
+        else {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "devsync-shared",
+        }
+    ),
 }
 
 SOCIALACCOUNT_PROVIDERS = {
@@ -208,7 +354,21 @@ ROOT_URLCONF = "DevSync.urls"
 
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
-TASKS = {"default": {"BACKEND": "django.tasks.backends.immediate.ImmediateBackend"}}
+# Tasks are stored in the database and run by `manage.py run_task_worker`.
+# Set TASK_BACKEND to django.tasks.backends.immediate.ImmediateBackend to run
+# them inside the enqueueing request instead (local development only).
+TASKS = {
+    "default": {
+        "BACKEND": env("TASK_BACKEND", default="core.backends.DatabaseBackend"),
+        "OPTIONS": {
+            "VISIBILITY_TIMEOUT": env.int("TASK_VISIBILITY_TIMEOUT", default=300),
+            "MAX_ATTEMPTS": env.int("TASK_MAX_ATTEMPTS", default=3),
+            "RETRY_DELAY": env.int("TASK_RETRY_DELAY", default=30),
+            # Finished tasks are deleted by the worker after this many seconds.
+            "RESULT_TTL": env.int("TASK_RESULT_TTL", default=7 * 24 * 3600),
+        },
+    }
+}
 
 TEMPLATES = [
     {
@@ -23,6 +23,8 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
 )
 
+from portfolios.views import PublicPortfolioView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
@@ -42,4 +44,5 @@ urlpatterns = [
     path("portfolio/", include("portfolios.urls")),
     path("themes/", include("themes.urls")),
     path("github/", include("github_integration.urls")),
+    path("p/<slug:slug>/", PublicPortfolioView.as_view(), name="public-portfolio"),
 ]
@@ -1,3 +1,20 @@
 from django.contrib import admin
 
+from .models import QueuedTask
+
+
 # Register your models here.
+class ModelQueuedTaskAdmin(admin.ModelAdmin):
+    list_display = (
+        "task_path",
+        "queue_name",
+        "status",
+        "enqueued_at",
+        "run_after",
+        "finished_at",
+    )
+    search_fields = ("id", "task_path")
+    list_filter = ("status", "queue_name", "task_path")
+
+
+admin.site.register(QueuedTask, ModelQueuedTaskAdmin)
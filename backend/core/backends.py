@@ -0,0 +1,267 @@
+import logging
+from datetime import timedelta
+from traceback import format_exception
+
+from django.db import transaction
+from django.db.models import Q
+from django.tasks.backends.base import BaseTaskBackend
+from django.tasks.base import TaskError, TaskResult, TaskResultStatus
+from django.tasks.exceptions import TaskResultDoesNotExist
+from django.tasks.signals import task_enqueued
+from django.utils import timezone
+from django.utils.json import normalize_json
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def _queued_task_model():
+    # Backends are built while tasks modules are imported, which can happen
+    # before the app registry is ready.
+    from .models import QueuedTask
+
+    return QueuedTask
+
+
+class DatabaseBackend(BaseTaskBackend):
+    """
+    Durable task backend storing enqueued tasks in the ``QueuedTask`` table.
+    Tasks are executed by ``manage.py run_task_worker``, never in the
+    process that enqueued them.
+
+    OPTIONS:
+        VISIBILITY_TIMEOUT: seconds a claimed task stays invisible to other
+            workers without a heartbeat before it is claimed again.
+        MAX_ATTEMPTS: runs of a task before it is marked FAILED.
+        RETRY_DELAY: seconds before the first retry, doubled per attempt.
+        RESULT_TTL: seconds finished tasks are kept before the worker
+            deletes them; None keeps them forever.
+    """
+
+    supports_defer = True
+    supports_async_task = True
+    supports_get_result = True
+    supports_priority = True
+
+    def __init__(self, alias, params):
+        super().__init__(alias, params)
+        self.visibility_timeout = timedelta(
+            seconds=self.options.get("VISIBILITY_TIMEOUT", 300)
+        )
+        self.max_attempts = self.options.get("MAX_ATTEMPTS", 3)
+        self.retry_delay = self.options.get("RETRY_DELAY", 30)
+        result_ttl = self.options.get("RESULT_TTL", 7 * 24 * 3600)
+        self.result_ttl = None if result_ttl is None else timedelta(seconds=result_ttl)
+
+    def _to_result(self, row):
+        task = import_string(row.task_path).using(
+            priority=row.priority,
+            queue_name=row.queue_name,
+            run_after=row.run_after,
+            backend=row.backend,
+        )
+        result = TaskResult(
+            task=task,
+            id=str(row.id),
+            status=TaskResultStatus(row.status),
+            enqueued_at=row.enqueued_at,
+            started_at=row.started_at,
+            last_attempted_at=row.last_attempted_at,
+            finished_at=row.finished_at,
+            args=row.args,
+            kwargs=row.kwargs,
+            backend=row.backend,
+            errors=[TaskError(**error) for error in row.errors],
+            worker_ids=row.worker_ids,
+        )
+        object.__setattr__(result, "_return_value", row.return_value)
+        return result
+
+    def enqueue(self, task, args, kwargs):
+        self.validate_task(task)
+
+        row = _queued_task_model().objects.create(
+            task_path=task.module_path,
+            queue_name=task.queue_name,
+            priority=task.priority,
+            backend=self.alias,
+            args=normalize_json(args),
+            kwargs=normalize_json(kwargs),
+            run_after=task.run_after,
+        )
+        task_result = self._to_result(row)
+        task_enqueued.send(type(self), task_result=task_result)
+        return task_result
+
+    def get_result(self, result_id):
+        QueuedTask = _queued_task_model()
+        try:
+            row = QueuedTask.objects.get(id=result_id)
+        except (QueuedTask.DoesNotExist, ValueError):
+            raise TaskResultDoesNotExist(result_id)
+        return self._to_result(row)
+
+    def claim(self, worker_id, queues, limit):
+        """
+        Mark up to ``limit`` runnable tasks as RUNNING for ``worker_id`` and
+        return their results. Runnable means READY and due, or RUNNING with
+        an expired lock because the worker holding it died.
+
+        On databases with row locks (PostgreSQL, MySQL) locked rows are
+        skipped, so several workers can claim side by side. SQLite ignores
+        ``skip_locked`` and serializes writers, so run a single worker there.
+        """
+        QueuedTask = _queued_task_model()
+        now = timezone.now()
+        with transaction.atomic():
+            rows = list(
+                QueuedTask.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(status=TaskResultStatus.READY)
+                    & (Q(run_after__isnull=True) | Q(run_after__lte=now))
+                    | Q(status=TaskResultStatus.RUNNING, locked_until__lt=now),
+                    queue_name__in=queues,
+                )
+                .order_by("-priority", "enqueued_at")[:limit]
+            )
+
+            claimed, abandoned = [], []
+            for row in rows:
+                if (
+                    row.status == TaskResultStatus.RUNNING
+                    and len(row.worker_ids) >= self.max_attempts
+                ):
+                    row.status = TaskResultStatus.FAILED
+                    row.finished_at = now
+                    row.locked_until = None
+                    row.errors.append(
+                        {
+                            "exception_class_path": "builtins.TimeoutError",
+                            "traceback": "Worker stopped sending heartbeats.",
+                        }
+                    )
+                    abandoned.append(row)
+                    continue
+                row.status = TaskResultStatus.RUNNING
+                row.started_at = row.started_at or now
+                row.last_attempted_at = now
+                row.locked_until = now + self.visibility_timeout
+                row.worker_ids.append(worker_id)
+                claimed.append(row)
+
+            QueuedTask.objects.bulk_update(
+                rows,
+                [
+                    "status",
+                    "started_at",
+                    "last_attempted_at",
+                    "finished_at",
+                    "locked_until",
+                    "worker_ids",
+                    "errors",
+                ],
+            )
+
+        for row in abandoned:
+            logger.error(f"Task {row.id} ({row.task_path}) abandoned by its worker")
+        return [self._to_result(row) for row in claimed]
+
+    def heartbeat(self, result_ids):
+        """Extend the lock of tasks a worker is still running."""
+        if not result_ids:
+            return 0
+        return (
+            _queued_task_model()
+            .objects.filter(id__in=result_ids, status=TaskResultStatus.RUNNING)
+            .update(locked_until=timezone.now() + self.visibility_timeout)
+        )
+
+    def complete(self, result_id, return_value):
+        _queued_task_model().objects.filter(id=result_id).update(
+            status=TaskResultStatus.SUCCESSFUL,
+            return_value=return_value,
+            finished_at=timezone.now(),
+            locked_until=None,
+        )
+        return self.get_result(result_id)
+
+    def fail(self, result_id, exception):
+        """
+        Record ``exception`` for a run of the task and schedule a retry with
+        exponential backoff, or mark it FAILED once attempts run out.
+        """
+        QueuedTask = _queued_task_model()
+        now = timezone.now()
+        exception_type = type(exception)
+        error = {
+            "exception_class_path": (
+                f"{exception_type.__module__}.{exception_type.__qualname__}"
+            ),
+            "traceback": "".join(format_exception(exception)),
+        }
+
+        with transaction.atomic():
+            row = QueuedTask.objects.select_for_update().get(id=result_id)
+            row.errors.append(error)
+            row.locked_until = None
+            attempts = len(row.worker_ids)
+            if attempts < self.max_attempts:
+                row.status = TaskResultStatus.READY
+                row.run_after = now + timedelta(
+                    seconds=self.retry_delay * 2 ** (attempts - 1)
+                )
+            else:
+                row.status = TaskResultStatus.FAILED
+                row.finished_at = now
+            row.save(
+                update_fields=[
+                    "errors",
+                    "locked_until",
+                    "status",
+                    "run_after",
+                    "finished_at",
+                ]
+            )
+        return self._to_result(row)
+
+    def prune(self, batch_size=1000):
+        """
+        Delete SUCCESSFUL and FAILED tasks finished more than RESULT_TTL ago.
+        Returns the number of tasks deleted.
+        """
+        if self.result_ttl is None:
+            return 0
+        QueuedTask = _queued_task_model()
+        expired = QueuedTask.objects.filter(
+            status__in=[TaskResultStatus.SUCCESSFUL, TaskResultStatus.FAILED],
+            finished_at__lt=timezone.now() - self.result_ttl,
+        ).order_by()
+        deleted = 0
+        while True:
+            ids = list(expired.values_list("id", flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            count, _ = QueuedTask.objects.filter(id__in=ids).delete()
+            deleted += count
+
+    def release(self, worker_id, result_ids):
+        """
+        Hand tasks interrupted by a worker shutdown back to the queue. The
+        interrupted run does not count as an attempt.
+        """
+        QueuedTask = _queued_task_model()
+        with transaction.atomic():
+            rows = list(
+                QueuedTask.objects.select_for_update().filter(
+                    id__in=result_ids, status=TaskResultStatus.RUNNING
+                )
+            )
+            for row in rows:
+                if row.worker_ids and row.worker_ids[-1] == worker_id:
+                    row.worker_ids.pop()
+                row.status = TaskResultStatus.READY
+                row.locked_until = None
+            QueuedTask.objects.bulk_update(
+                rows, ["worker_ids", "status", "locked_until"]
+            )
+        return len(rows)
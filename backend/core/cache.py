@@ -0,0 +1,216 @@
+import logging
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LocalLRU:
+    """
+    Bounded in-process store with per-entry expiry. Values are pickled, as in
+    LocMemCache, so callers can't mutate a cached object in place.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, pickled = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+        return pickle.loads(pickled)
+
+    def set(self, key, value, timeout):
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, pickled)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class TieredCache(BaseCache):
+    """
+    Cache backend reading through a small per-process LRU (L1) to a shared
+    cache (L2, another CACHES alias, normally Redis).
+
+    OPTIONS:
+
+    - ``L2``: alias of the shared cache.
+    - ``L1_MAX_ENTRIES``: size of the per-process LRU.
+    - ``L1_TIMEOUT``: seconds an entry is served from L1. It bounds how long
+      a process can return a value another process has changed or deleted.
+    - ``NAMESPACES``: ``{name: {"prefix": ..., "timeout": ..., "version":
+      ..., "l1": bool}}``. A key belongs to the namespace with the longest
+      matching prefix. ``timeout`` applies when a caller passes none,
+      ``version`` when a caller passes none, and ``"l1": False`` bypasses
+      L1 for keys that must always be read from the shared cache.
+    - ``STATS_INTERVAL``: seconds between hit/miss log lines; 0 disables.
+
+    Shared-cache errors on reads and writes are logged and counted, and the
+    call degrades to a miss or a no-op rather than failing the request.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._l2_alias = options["L2"]
+        self._l1 = LocalLRU(options.get("L1_MAX_ENTRIES", 1024))
+        self._l1_timeout = options.get("L1_TIMEOUT", 5)
+        self._namespaces = sorted(
+            (
+                (config["prefix"], name, config)
+                for name, config in options.get("NAMESPACES", {}).items()
+            ),
+            key=lambda namespace: len(namespace[0]),
+            reverse=True,
+        )
+        self._stats_interval = options.get("STATS_INTERVAL", 300)
+        self._stats = defaultdict(Counter)
+        self._stats_lock = threading.Lock()
+        self._stats_logged_at = time.monotonic()
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    def _namespace(self, key):
+        for prefix, name, config in self._namespaces:
+            if key.startswith(prefix):
+                return name, config
+        return "default", {}
+
+    def _count(self, namespace, event):
+        with self._stats_lock:
+            self._stats[namespace][event] += 1
+        if (
+            self._stats_interval
+            and time.monotonic() - self._stats_logged_at > self._stats_interval
+        ):
+            self._stats_logged_at = time.monotonic()
+            logger.info(f"Cache stats: {self.stats()}")
+
+    def stats(self):
+        """Hit, miss and error counts of this process, per namespace."""
+        with self._stats_lock:
+            return {
+                namespace: dict(counts) for namespace, counts in self._stats.items()
+            }
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats.clear()
+
+    def _resolve(self, key, timeout, version):
+        name, config = self._namespace(key)
+        if timeout is DEFAULT_TIMEOUT and "timeout" in config:
+            timeout = config["timeout"]
+        if version is None:
+            version = config.get("version")
+        return name, config.get("l1", True), timeout, version
+
+    def _l1_key(self, key, version):
+        return self.l2.make_key(key, version=version)
+
+    def _l1_store(self, l1_key, value, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.l2.default_timeout
+        if timeout is None:
+            timeout = self._l1_timeout
+        if timeout > 0:
+            self._l1.set(l1_key, value, min(timeout, self._l1_timeout))
+
+    def get(self, key, default=None, version=None):
+        name, use_l1, _, version = self._resolve(key, DEFAULT_TIMEOUT, version)
+        l1_key = self._l1_key(key, version)
+        if use_l1:
+            value = self._l1.get(l1_key)
+            if value is not _MISSING:
+                self._count(name, "l1_hits")
+                return value
+
+        try:
+            value = self.l2.get(key, _MISSING, version=version)
+        except Exception as e:
+            logger.warning(f"Shared cache read of {key} failed: {e}")
+            self._count(name, "errors")
+            return default
+
+        if value is _MISSING:
+            self._count(name, "misses")
+            return default
+        self._count(name, "l2_hits")
+        if use_l1:
+            self._l1_store(l1_key, value, self._l1_timeout)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        name, use_l1, timeout, version = self._resolve(key, timeout, version)
+        l1_key = self._l1_key(key, version)
+        self._l1.delete(l1_key)
+        try:
+            self.l2.set(key, value, timeout, version=version)
+        except Exception as e:
+            logger.warning(f"Shared cache write of {key} failed: {e}")
+            self._count(name, "errors")
+            return
+        if use_l1:
+            self._l1_store(l1_key, value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        _, use_l1, timeout, version = self._resolve(key, timeout, version)
+        added = self.l2.add(key, value, timeout, version=version)
+        if added and use_l1:
+            self._l1_store(self._l1_key(key, version), value, timeout)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        _, _, timeout, version = self._resolve(key, timeout, version)
+        self._l1.delete(self._l1_key(key, version))
+        return self.l2.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        name, _, _, version = self._resolve(key, DEFAULT_TIMEOUT, version)
+        self._l1.delete(self._l1_key(key, version))
+        try:
+            return self.l2.delete(key, version=version)
+        except Exception as e:
+            logger.warning(f"Shared cache delete of {key} failed: {e}")
+            self._count(name, "errors")
+            return False
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def incr(self, key, delta=1, version=None):
+        # Counters live in the shared cache only; L1 copies would diverge.
+        _, _, _, version = self._resolve(key, DEFAULT_TIMEOUT, version)
+        self._l1.delete(self._l1_key(key, version))
+        return self.l2.incr(key, delta, version=version)
+
+    def clear(self):
+        self._l1.clear()
+        self.l2.clear()
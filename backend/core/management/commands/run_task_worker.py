@@ -0,0 +1,64 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+from django.tasks import DEFAULT_TASK_BACKEND_ALIAS, task_backends
+
+from core.backends import DatabaseBackend
+from core.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Run tasks enqueued through the database task backend."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--backend",
+            default=DEFAULT_TASK_BACKEND_ALIAS,
+            help="Alias of the TASKS backend to run tasks for.",
+        )
+        parser.add_argument(
+            "--queue",
+            action="append",
+            dest="queues",
+            help="Queue to take tasks from; repeat for several (defaults to all).",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=10,
+            help="Tasks run at the same time on the worker's event loop.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds between checks for new tasks when idle.",
+        )
+        parser.add_argument(
+            "--shutdown-timeout",
+            type=float,
+            default=30.0,
+            help="Seconds running tasks get to finish after SIGINT/SIGTERM.",
+        )
+        parser.add_argument(
+            "--prune-interval",
+            type=float,
+            default=3600.0,
+            help="Seconds between deletions of finished tasks past TASK_RESULT_TTL.",
+        )
+
+    def handle(self, *args, **options):
+        if not isinstance(task_backends[options["backend"]], DatabaseBackend):
+            raise CommandError(
+                f"Task backend '{options['backend']}' is not a DatabaseBackend."
+            )
+
+        worker = Worker(
+            backend=options["backend"],
+            queues=options["queues"],
+            concurrency=options["concurrency"],
+            poll_interval=options["poll_interval"],
+            shutdown_timeout=options["shutdown_timeout"],
+            prune_interval=options["prune_interval"],
+        )
+        asyncio.run(worker.run())
@@ -0,0 +1,80 @@
+# Generated by Django 6.0.1 on 2026-10-18 13:05
+
+import django.core.serializers.json
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="QueuedTask",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("task_path", models.CharField(max_length=255)),
+                ("queue_name", models.CharField(max_length=100)),
+                ("priority", models.IntegerField(default=0)),
+                ("backend", models.CharField(max_length=100)),
+                ("args", models.JSONField(blank=True, default=list)),
+                ("kwargs", models.JSONField(blank=True, default=dict)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("READY", "Ready"),
+                            ("RUNNING", "Running"),
+                            ("FAILED", "Failed"),
+                            ("SUCCESSFUL", "Successful"),
+                        ],
+                        default="READY",
+                        max_length=20,
+                    ),
+                ),
+                ("run_after", models.DateTimeField(blank=True, null=True)),
+                (
+                    "enqueued_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("last_attempted_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("locked_until", models.DateTimeField(blank=True, null=True)),
+                ("worker_ids", models.JSONField(blank=True, default=list)),
+                ("errors", models.JSONField(blank=True, default=list)),
+                (
+                    "return_value",
+                    models.JSONField(
+                        blank=True,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        null=True,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-enqueued_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "run_after"],
+                        name="core_queued_status_7916b7_idx",
+                    ),
+                    models.Index(
+                        fields=["status", "locked_until"],
+                        name="core_queued_status_304dd2_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 20:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="queuedtask",
+            index=models.Index(
+                fields=["status", "finished_at"], name="core_queued_status_edd8b8_idx"
+            ),
+        ),
+    ]
@@ -1,3 +1,50 @@
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.tasks import TaskResultStatus
+from django.utils import timezone
+
+
+class QueuedTask(models.Model):
+    """
+    A task enqueued through the database task backend, together with the
+    state of its latest run. Workers claim READY rows and hold them RUNNING
+    until ``locked_until``; a row whose lock ran out is claimable again.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task_path = models.CharField(max_length=255)
+    queue_name = models.CharField(max_length=100)
+    priority = models.IntegerField(default=0)
+    backend = models.CharField(max_length=100)
+
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(
+        max_length=20,
+        choices=TaskResultStatus.choices,
+        default=TaskResultStatus.READY,
+    )
+    run_after = models.DateTimeField(null=True, blank=True)
+    enqueued_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    last_attempted_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+
+    worker_ids = models.JSONField(default=list, blank=True)
+    errors = models.JSONField(default=list, blank=True)
+    return_value = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+
+    def __str__(self):
+        return f"{self.task_path} - {self.status}"
 
-# Create your models here.
+    class Meta:
+        ordering = ["-enqueued_at"]
+        indexes = [
+            models.Index(fields=["status", "run_after"]),
+            models.Index(fields=["status", "locked_until"]),
+            models.Index(fields=["status", "finished_at"]),
+        ]
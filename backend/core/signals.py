@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent with ``asend`` on the worker's event loop once it has stopped running
+# tasks, so apps can release loop-bound resources such as pooled clients.
+worker_stopping = Signal()
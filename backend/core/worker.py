@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import signal
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.tasks import DEFAULT_TASK_BACKEND_ALIAS, TaskContext, task_backends
+from django.tasks.signals import task_finished, task_started
+from django.utils.crypto import get_random_string
+from django.utils.json import normalize_json
+
+from .signals import worker_stopping
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """
+    Runs tasks of a ``DatabaseBackend`` concurrently on a single event loop.
+
+    Up to ``concurrency`` tasks are in flight at once; their locks are
+    renewed by a heartbeat. Finished tasks past the backend's RESULT_TTL are
+    deleted every ``prune_interval`` seconds. On SIGINT/SIGTERM the worker
+    stops claiming, gives running tasks ``shutdown_timeout`` seconds to
+    finish, and hands the rest back to the queue.
+
+    SQLite cannot lock rows, so run a single worker against it.
+    """
+
+    def __init__(
+        self,
+        backend=DEFAULT_TASK_BACKEND_ALIAS,
+        queues=None,
+        concurrency=10,
+        poll_interval=1.0,
+        shutdown_timeout=30.0,
+        prune_interval=3600.0,
+    ):
+        self.backend = task_backends[backend]
+        self.queues = list(queues or self.backend.queues)
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.shutdown_timeout = shutdown_timeout
+        self.prune_interval = prune_interval
+        self.worker_id = get_random_string(32)
+        self.running = {}
+
+    def stop(self):
+        if not self._stopping.is_set():
+            logger.info(f"Worker {self.worker_id} stopping")
+            self._stopping.set()
+            self._wakeup.set()
+
+    async def _execute(self, task_result):
+        task = task_result.task
+        await task_started.asend(type(self.backend), task_result=task_result)
+        try:
+            if task.takes_context:
+                return_value = await task.acall(
+                    TaskContext(task_result=task_result),
+                    *task_result.args,
+                    **task_result.kwargs,
+                )
+            else:
+                return_value = await task.acall(*task_result.args, **task_result.kwargs)
+            return_value = normalize_json(return_value)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            task_result = await sync_to_async(self.backend.fail)(task_result.id, e)
+        else:
+            task_result = await sync_to_async(self.backend.complete)(
+                task_result.id, return_value
+            )
+        # The task is READY again when a retry is scheduled.
+        if task_result.is_finished:
+            await task_finished.asend(type(self.backend), task_result=task_result)
+
+    def _done(self, result_id, future):
+        self.running.pop(result_id, None)
+        self._wakeup.set()
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(
+                f"Worker {self.worker_id} failed to record task {result_id}",
+                exc_info=future.exception(),
+            )
+
+    async def _heartbeat(self):
+        interval = self.backend.visibility_timeout.total_seconds() / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await sync_to_async(self.backend.heartbeat)(list(self.running))
+            except Exception as e:
+                logger.warning(f"Worker {self.worker_id} heartbeat failed: {e}")
+
+    async def _prune(self):
+        while True:
+            try:
+                deleted = await sync_to_async(self.backend.prune)()
+            except Exception as e:
+                logger.warning(f"Worker {self.worker_id} failed to prune tasks: {e}")
+            else:
+                if deleted:
+                    logger.info(
+                        f"Worker {self.worker_id} deleted {deleted} finished tasks"
+                    )
+            await asyncio.sleep(self.prune_interval)
+
+    async def _claim(self):
+        await sync_to_async(close_old_connections)()
+        free = self.concurrency - len(self.running)
+        if free <= 0:
+            return
+        results = await sync_to_async(self.backend.claim)(
+            self.worker_id, self.queues, free
+        )
+        for task_result in results:
+            future = asyncio.create_task(self._execute(task_result))
+            future.add_done_callback(
+                lambda f, result_id=task_result.id: self._done(result_id, f)
+            )
+            self.running[task_result.id] = future
+
+    async def _shutdown(self):
+        if self.running:
+            logger.info(
+                f"Worker {self.worker_id} waiting for {len(self.running)} tasks"
+            )
+            await asyncio.wait(
+                list(self.running.values()), timeout=self.shutdown_timeout
+            )
+
+        interrupted = dict(self.running)
+        for future in interrupted.values():
+            future.cancel()
+        await asyncio.gather(*interrupted.values(), return_exceptions=True)
+        if interrupted:
+            released = await sync_to_async(self.backend.release)(
+                self.worker_id, list(interrupted)
+            )
+            logger.warning(
+                f"Worker {self.worker_id} returned {released} tasks to the queue"
+            )
+
+    async def run(self):
+        self._stopping = asyncio.Event()
+        self._wakeup = asyncio.Event()
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stop)
+
+        logger.info(
+            f"Worker {self.worker_id} started on queues {self.queues} "
+            f"with concurrency {self.concurrency}"
+        )
+        heartbeat = asyncio.create_task(self._heartbeat())
+        prune = asyncio.create_task(self._prune())
+        try:
+            while not self._stopping.is_set():
+                self._wakeup.clear()
+                try:
+                    await self._claim()
+                except Exception as e:
+                    logger.error(f"Worker {self.worker_id} failed to claim tasks: {e}")
+
+                # Sleep until a task finishes, the poll interval passes or the
+                # worker is told to stop.
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except TimeoutError:
+                    pass
+            await self._shutdown()
+        finally:
+            heartbeat.cancel()
+            prune.cancel()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(sig)
+            await worker_stopping.asend(sender=type(self), worker=self)
+            await sync_to_async(close_old_connections)()
+        logger.info(f"Worker {self.worker_id} stopped")
@@ -2,12 +2,20 @@ from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
 from github_integration.models import GithubProfile, Repository
+from github_integration.serializers import LanguageBreakdownSerializer
 
 
 class GithubProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = GithubProfile
-        exclude = ("id", "user", "access_token")
+        exclude = (
+            "id",
+            "user",
+            "access_token",
+            "token_valid",
+            "token_checked_at",
+            "next_sync_at",
+        )
 
 
 class RepositorySerializer(serializers.ModelSerializer):
@@ -24,6 +32,21 @@ class DashboardRequestSerializer(serializers.Serializer):
     )
 
 
+class LastSyncSerializer(serializers.Serializer):
+    sync_type = serializers.CharField()
+    status = serializers.CharField()
+    completed_at = serializers.DateTimeField(allow_null=True)
+
+
+class DashboardStatsSerializer(serializers.Serializer):
+    repository_count = serializers.IntegerField()
+    total_stars = serializers.IntegerField()
+    total_forks = serializers.IntegerField()
+    commits_last_30_days = serializers.IntegerField()
+    commits_last_365_days = serializers.IntegerField()
+    last_sync = LastSyncSerializer(allow_null=True)
+
+
 class DashboardResponseSerializer(serializers.Serializer):
     id = serializers.IntegerField()
     username = serializers.CharField(max_length=150)
@@ -35,7 +58,13 @@ class DashboardResponseSerializer(serializers.Serializer):
     portfolio_slug = serializers.SlugField(max_length=255)
     github_profile = GithubProfileSerializer(allow_null=True)
 
+    stats = serializers.SerializerMethodField()
     repository_details = serializers.SerializerMethodField()
+    languages = serializers.SerializerMethodField()
+
+    @extend_schema_field(DashboardStatsSerializer)
+    def get_stats(self, obj):
+        return DashboardStatsSerializer(self.context["stats"]).data
 
     @extend_schema_field(RepositorySerializer(many=True))
     def get_repository_details(self, obj):
@@ -43,3 +72,9 @@ class DashboardResponseSerializer(serializers.Serializer):
             "-updated_at_github"
         )[: self.context.get("repository_count", 6)]
         return RepositorySerializer(repositories, many=True).data
+
+    @extend_schema_field(LanguageBreakdownSerializer(many=True))
+    def get_languages(self, obj):
+        return LanguageBreakdownSerializer(
+            self.context["stats"]["languages"], many=True
+        ).data
@@ -0,0 +1,16 @@
+from django.dispatch import receiver
+
+from github_integration.signals import sync_finished, webhook_applied
+
+from .stats import drop_dashboard_stats
+
+
+@receiver(sync_finished)
+def drop_stats_after_sync(sender, user_id, **kwargs):
+    drop_dashboard_stats(user_id)
+
+
+@receiver(webhook_applied)
+def drop_stats_after_webhook(sender, user_ids, **kwargs):
+    for user_id in user_ids:
+        drop_dashboard_stats(user_id)
@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from github_integration.languages import profile_language_breakdown
+from github_integration.models import ContributionDay, GitHubSyncLog, Repository
+
+
+# Syncs reported as the last sync; the trailing languages refresh of every
+# full sync would otherwise always be the newest.
+REPORTED_SYNC_TYPES = ("repositories", "commits")
+
+
+def stats_cache_key(user_id):
+    return f"dashboard_stats:{user_id}"
+
+
+def compute_dashboard_stats(user_id):
+    """
+    Aggregates shown on a user's dashboard. Each part is a single aggregate
+    query over indexed or pre-aggregated rows, so the cost does not grow
+    with the number of repositories or commits.
+    """
+    repositories = Repository.objects.filter(github_profile__user_id=user_id).aggregate(
+        repository_count=Count("id"),
+        total_stars=Coalesce(Sum("stars_count"), 0),
+        total_forks=Coalesce(Sum("forks_count"), 0),
+    )
+
+    # Commit counts come from the daily rollup, so these are UTC days.
+    today = timezone.now().date()
+    commits = ContributionDay.objects.filter(
+        github_profile__user_id=user_id, day__gt=today - timedelta(days=365)
+    ).aggregate(
+        commits_last_365_days=Coalesce(Sum("commit_count"), 0),
+        commits_last_30_days=Coalesce(
+            Sum("commit_count", filter=Q(day__gt=today - timedelta(days=30))), 0
+        ),
+    )
+
+    last_sync = (
+        GitHubSyncLog.objects.filter(
+            github_profile__user_id=user_id, sync_type__in=REPORTED_SYNC_TYPES
+        )
+        .order_by("-started_at")
+        .values("sync_type", "status", "completed_at")
+        .first()
+    )
+
+    return {
+        **repositories,
+        **commits,
+        "last_sync": last_sync,
+        "languages": profile_language_breakdown(user_id),
+    }
+
+
+def get_dashboard_stats(user_id):
+    """
+    Cached dashboard aggregates, dropped whenever a sync of the user ends or
+    a webhook changes their repositories.
+    """
+    key = stats_cache_key(user_id)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_dashboard_stats(user_id)
+        cache.set(key, stats)
+    return stats
+
+
+def drop_dashboard_stats(user_id):
+    cache.delete(stats_cache_key(user_id))
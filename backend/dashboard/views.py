@@ -8,6 +8,7 @@ from .serializers import (
     DashboardRequestSerializer,
     DashboardResponseSerializer,
 )
+from .stats import get_dashboard_stats
 
 
 # Create your views here.
@@ -19,7 +20,6 @@ class DashboardView(GenericViewSet):
         return (
             get_user_model()
             .objects.select_related("github_profile")
-            .prefetch_related("github_profile__repositories")
             .filter(pk=self.request.user.pk)
         )
 
@@ -35,5 +35,11 @@ class DashboardView(GenericViewSet):
         serializer.is_valid(raise_exception=True)
         repo_count = serializer.validated_data.get("repository_count")
         user = self.get_queryset().get()
-        serializer = self.get_serializer(user, context={"repository_count": repo_count})
+        serializer = self.get_serializer(
+            user,
+            context={
+                "repository_count": repo_count,
+                "stats": get_dashboard_stats(user.pk),
+            },
+        )
         return Response(serializer.data)
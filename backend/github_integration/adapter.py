@@ -5,7 +5,8 @@ from django.contrib.auth import get_user_model
 from django.utils.dateparse import parse_datetime
 
 from .models import GithubProfile
-from .tasks import sync_repositories_task
+from .leases import start_sync
+from .tokens import set_token_validity
 
 User = get_user_model()
 
@@ -48,10 +49,15 @@ class GitHubSocialAccountAdapter(DefaultSocialAccountAdapter):
             if created_at:
                 profile["joined_date"] = parse_datetime(created_at)
 
-            GithubProfile.objects.update_or_create(user=user, defaults=profile)
+            github_profile, _ = GithubProfile.objects.update_or_create(
+                user=user, defaults=profile
+            )
 
             if token:
-                sync_repositories_task.aenqueue(user.id, token)
+                # A token just issued by GitHub is valid; this also clears a
+                # cached "invalid" left by the token it replaces.
+                set_token_validity(github_profile, True)
+                start_sync(github_profile, "repositories")
         return user
 
     def pre_social_login(self, request, sociallogin):
@@ -1,6 +1,15 @@
 from django.contrib import admin
+from django.db.models import FloatField
+from django.db.models.fields.json import KT
+from django.db.models.functions import Cast
 
-from .models import Commit, GithubProfile, GitHubSyncLog, Repository
+from .models import (
+    Commit,
+    GithubProfile,
+    GitHubSyncLog,
+    Repository,
+    WebhookDelivery,
+)
 
 
 # Register your models here.
@@ -41,13 +50,64 @@ class ModelCommitAdmin(admin.ModelAdmin):
     list_filter = ("date",)
 
 
+def _metric_column(name, description):
+    """Changelist column for one key of GitHubSyncLog.metrics, sortable."""
+
+    @admin.display(
+        description=description,
+        ordering=Cast(KT(f"metrics__{name}"), FloatField()),
+    )
+    def column(self, obj):
+        return obj.metrics.get(name)
+
+    column.__name__ = f"metric_{name}"
+    return column
+
+
 class ModelGitHubSyncLogAdmin(admin.ModelAdmin):
-    list_display = ("github_profile", "status", "completed_at", "status")
+    metric_pages = _metric_column("pages", "Pages")
+    metric_bytes_received = _metric_column("bytes_received", "Bytes")
+    metric_http_time = _metric_column("http_time", "HTTP (s)")
+    metric_parse_time = _metric_column("parse_time", "Parse (s)")
+    metric_db_time = _metric_column("db_time", "DB (s)")
+    metric_rate_limit_wait = _metric_column("rate_limit_wait", "Rate-limit wait (s)")
+    metric_retries = _metric_column("retries", "Retries")
+    metric_rows_inserted = _metric_column("rows_inserted", "Inserted")
+    metric_rows_updated = _metric_column("rows_updated", "Updated")
+    metric_rows_unchanged = _metric_column("rows_unchanged", "Unchanged")
+
+    list_display = (
+        "github_profile",
+        "sync_type",
+        "status",
+        "completed_at",
+        "duration",
+        "metric_pages",
+        "metric_bytes_received",
+        "metric_http_time",
+        "metric_parse_time",
+        "metric_db_time",
+        "metric_rate_limit_wait",
+        "metric_retries",
+        "metric_rows_inserted",
+        "metric_rows_updated",
+        "metric_rows_unchanged",
+        "rate_limit_remaining",
+        "rate_limit_reset_at",
+    )
     search_fields = ("github_profile__github_username", "status")
-    list_filter = ("status", "completed_at")
+    list_filter = ("status", "sync_type", "completed_at")
+    readonly_fields = ("repo_outcomes",)
+
+
+class ModelWebhookDeliveryAdmin(admin.ModelAdmin):
+    list_display = ("delivery_id", "event", "action", "status", "received_at")
+    search_fields = ("delivery_id",)
+    list_filter = ("event", "status", "received_at")
 
 
 admin.site.register(GithubProfile, ModelGithubProfileAdmin)
 admin.site.register(Repository, ModelRepositoryAdmin)
 admin.site.register(Commit, ModelCommitAdmin)
 admin.site.register(GitHubSyncLog, ModelGitHubSyncLogAdmin)
+admin.site.register(WebhookDelivery, ModelWebhookDeliveryAdmin)
@@ -7,3 +7,4 @@ class GithubIntegrationConfig(AppConfig):
 
     def ready(self):
         import github_integration.adapter
+        import github_integration.signals
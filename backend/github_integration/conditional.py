@@ -0,0 +1,107 @@
+import hashlib
+import json
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from .models import GitHubRequestValidator
+
+VALIDATOR_FIELDS = ("etag", "last_modified", "next_url", "last_url")
+
+
+def validator_key(url, params, token, profile_id=None):
+    """
+    Stable key for a request. The profile id keeps validators of different
+    profiles apart even if they share a token, and the token is hashed so no
+    credential ends up in the store.
+    """
+    token_hash = hashlib.sha256((token or "").encode()).hexdigest()
+    raw = json.dumps(
+        [url, sorted((params or {}).items()), profile_id, token_hash], default=str
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class CacheValidatorStore:
+    """
+    Keeps validators in a Django cache. Size is bounded by the cache backend's
+    own eviction and by GITHUB_VALIDATOR_TTL.
+    """
+
+    prefix = "github_validator"
+
+    def __init__(self):
+        self.cache = caches[settings.GITHUB_VALIDATOR_CACHE_ALIAS]
+        self.timeout = settings.GITHUB_VALIDATOR_TTL
+
+    async def get(self, key):
+        return await self.cache.aget(f"{self.prefix}:{key}")
+
+    async def set(self, key, record):
+        await self.cache.aset(f"{self.prefix}:{key}", record, self.timeout)
+
+
+class DatabaseValidatorStore:
+    """
+    Keeps validators in the GitHubRequestValidator table, evicting the least
+    recently used rows once GITHUB_VALIDATOR_MAX_ENTRIES is exceeded.
+    """
+
+    # Rows are only re-stamped on read when older than this, so hits on hot
+    # pages do not turn into one UPDATE per request.
+    touch_interval = timedelta(hours=1)
+    prune_probability = 0.01
+
+    def __init__(self):
+        self.max_entries = settings.GITHUB_VALIDATOR_MAX_ENTRIES
+
+    async def get(self, key):
+        record = (
+            await GitHubRequestValidator.objects.filter(key=key)
+            .values(*VALIDATOR_FIELDS)
+            .afirst()
+        )
+        if record:
+            now = timezone.now()
+            await GitHubRequestValidator.objects.filter(
+                key=key, used_at__lt=now - self.touch_interval
+            ).aupdate(used_at=now)
+        return record
+
+    async def set(self, key, record):
+        await GitHubRequestValidator.objects.aupdate_or_create(
+            key=key, defaults={field: record.get(field) for field in VALIDATOR_FIELDS}
+        )
+        if random.random() < self.prune_probability:
+            await self.prune()
+
+    async def prune(self):
+        cutoff = (
+            await GitHubRequestValidator.objects.order_by("-used_at")
+            .values_list("used_at", flat=True)[self.max_entries : self.max_entries + 1]
+            .afirst()
+        )
+        if cutoff is not None:
+            await GitHubRequestValidator.objects.filter(used_at__lte=cutoff).adelete()
+
+
+VALIDATOR_STORES = {
+    "cache": CacheValidatorStore,
+    "database": DatabaseValidatorStore,
+}
+
+_store = None
+
+
+def get_validator_store():
+    """Return the configured validator store, or None when disabled."""
+    global _store
+    backend = settings.GITHUB_VALIDATOR_STORE
+    if backend not in VALIDATOR_STORES:
+        return None
+    if not isinstance(_store, VALIDATOR_STORES[backend]):
+        _store = VALIDATOR_STORES[backend]()
+    return _store
@@ -0,0 +1,97 @@
+from collections import Counter, defaultdict
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+from .models import Commit, ContributionDay
+
+
+def _day(value):
+    # Days are UTC days, like GitHub's contribution graph.
+    return value.astimezone(dt_timezone.utc).date()
+
+
+def add_contributions(commits):
+    """
+    Count newly inserted ``commits`` into the daily rollup. Runs inside the
+    transaction that inserted them, so the rollup never runs ahead of or
+    behind the commit table.
+
+    Missing rows are created empty, ignoring rows a concurrent writer has
+    just created, and counts are added with ``commit_count + n`` updates,
+    so concurrent writers to the same day add up instead of colliding.
+    """
+    counts = Counter(
+        (commit.github_profile_id, commit.repository_id, _day(commit.date))
+        for commit in commits
+        if commit.date
+    )
+    if not counts:
+        return
+
+    ContributionDay.objects.bulk_create(
+        [
+            ContributionDay(
+                github_profile_id=profile_id,
+                repository_id=repository_id,
+                day=day,
+                commit_count=0,
+            )
+            for profile_id, repository_id, day in counts
+        ],
+        ignore_conflicts=True,
+    )
+
+    # One UPDATE per repository and count; a batch of commits usually spans
+    # a single repository and a handful of distinct daily counts.
+    days_by_increment = defaultdict(list)
+    for (profile_id, repository_id, day), count in counts.items():
+        days_by_increment[profile_id, repository_id, count].append(day)
+    for (profile_id, repository_id, count), days in days_by_increment.items():
+        ContributionDay.objects.filter(
+            github_profile_id=profile_id, repository_id=repository_id, day__in=days
+        ).update(commit_count=F("commit_count") + count)
+
+
+def rebuild_contributions(profile):
+    """Recompute a profile's rollup from its commits. Returns the row count."""
+    rows = (
+        Commit.objects.filter(github_profile=profile)
+        .annotate(day=TruncDate("date", tzinfo=dt_timezone.utc))
+        .values("repository_id", "day")
+        .annotate(commit_count=Count("id"))
+        .order_by()
+    )
+    days = [
+        ContributionDay(
+            github_profile=profile,
+            repository_id=row["repository_id"],
+            day=row["day"],
+            commit_count=row["commit_count"],
+        )
+        for row in rows
+    ]
+    with transaction.atomic():
+        ContributionDay.objects.filter(github_profile=profile).delete()
+        ContributionDay.objects.bulk_create(
+            days, batch_size=settings.GITHUB_SYNC_BATCH_SIZE
+        )
+    return len(days)
+
+
+def daily_contributions(user_id, start, end):
+    """
+    Commits per day of a user's GitHub profile between ``start`` and ``end``
+    (inclusive), summed over repositories. Days without commits are omitted.
+    """
+    return list(
+        ContributionDay.objects.filter(
+            github_profile__user_id=user_id, day__gte=start, day__lte=end
+        )
+        .values("day")
+        .annotate(count=Sum("commit_count"))
+        .order_by("day")
+    )
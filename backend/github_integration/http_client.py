@@ -0,0 +1,111 @@
+import asyncio
+import importlib.util
+import logging
+import weakref
+
+import httpx
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# httpx connection pools are bound to the event loop that opened them, so the
+# shared client is kept per loop. A worker runs a single loop, which makes this
+# one pooled client per worker process.
+_clients = weakref.WeakKeyDictionary()
+_closers = weakref.WeakKeyDictionary()
+_request_semaphores = weakref.WeakKeyDictionary()
+
+
+def _http2_enabled():
+    if not settings.GITHUB_HTTP2:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning(
+            "GITHUB_HTTP2 is enabled but the 'h2' package is not installed; "
+            "falling back to HTTP/1.1."
+        )
+        return False
+    return True
+
+
+def build_http_client(**kwargs):
+    """
+    Build an AsyncClient configured for GitHub. Extra keyword arguments are
+    passed through to httpx, e.g. a transport pointing at a local stand-in.
+    """
+    options = {
+        "http2": _http2_enabled(),
+        "timeout": httpx.Timeout(
+            connect=settings.GITHUB_HTTP_CONNECT_TIMEOUT,
+            read=settings.GITHUB_HTTP_READ_TIMEOUT,
+            write=settings.GITHUB_HTTP_READ_TIMEOUT,
+            pool=settings.GITHUB_HTTP_POOL_TIMEOUT,
+        ),
+        "limits": httpx.Limits(
+            max_connections=settings.GITHUB_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.GITHUB_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.GITHUB_HTTP_KEEPALIVE_EXPIRY,
+        ),
+    }
+    options.update(kwargs)
+    return httpx.AsyncClient(**options)
+
+
+async def _close_on_shutdown(client):
+    # asyncio.run() and async_to_sync() cancel the tasks left on a loop
+    # before closing it, which lets this close the client while its loop can
+    # still run the connections' shutdown.
+    try:
+        await asyncio.get_running_loop().create_future()
+    finally:
+        await client.aclose()
+
+
+def get_http_client():
+    """
+    Return the pooled client shared by every GitHub request made on the
+    running event loop, creating it on first use. The client is closed when
+    the loop shuts down, or earlier by close_http_client().
+    """
+    loop = asyncio.get_running_loop()
+
+    # Loops closed without cancelling their tasks; nothing can run the
+    # close of their clients any more.
+    for stale_loop in [key for key in _clients if key.is_closed()]:
+        del _clients[stale_loop]
+        _closers.pop(stale_loop, None)
+
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = build_http_client()
+        _clients[loop] = client
+        closer = _closers.get(loop)
+        if closer is not None:
+            closer.cancel()
+        _closers[loop] = loop.create_task(_close_on_shutdown(client))
+    return client
+
+
+def get_request_semaphore():
+    """
+    Semaphore capping in-flight GitHub requests on the running event loop to
+    the pool size, so bursts queue here instead of timing out waiting for a
+    pooled connection.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _request_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(settings.GITHUB_HTTP_MAX_CONNECTIONS)
+        _request_semaphores[loop] = semaphore
+    return semaphore
+
+
+async def close_http_client():
+    """Close the shared client of the running event loop, if any."""
+    loop = asyncio.get_running_loop()
+    closer = _closers.pop(loop, None)
+    if closer is not None:
+        closer.cancel()
+    client = _clients.pop(loop, None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
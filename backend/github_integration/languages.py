@@ -0,0 +1,165 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .models import GithubProfile, ProfileLanguage, Repository, RepositoryLanguage
+from .signals import profile_languages_changed
+
+
+def apply_language_deltas(profile_id, old, new):
+    """
+    Add the difference between a repository's previous and current
+    ``{language: bytes}`` breakdown to its profile's totals. Languages whose
+    last repository went away are dropped. Must run inside a transaction.
+    """
+    deltas = {}
+    for language in old.keys() | new.keys():
+        byte_delta = new.get(language, 0) - old.get(language, 0)
+        count_delta = (language in new) - (language in old)
+        if byte_delta or count_delta:
+            deltas[language] = (byte_delta, count_delta)
+    if not deltas:
+        return
+
+    existing = {
+        row.language: row
+        for row in ProfileLanguage.objects.select_for_update().filter(
+            github_profile_id=profile_id, language__in=deltas
+        )
+    }
+    to_create, to_update, to_delete = [], [], []
+    for language, (byte_delta, count_delta) in deltas.items():
+        row = existing.get(language)
+        if row is None:
+            if count_delta > 0:
+                to_create.append(
+                    ProfileLanguage(
+                        github_profile_id=profile_id,
+                        language=language,
+                        bytes=max(byte_delta, 0),
+                        repository_count=count_delta,
+                    )
+                )
+            continue
+
+        row.bytes = max(row.bytes + byte_delta, 0)
+        row.repository_count = max(row.repository_count + count_delta, 0)
+        if row.repository_count == 0:
+            to_delete.append(row.pk)
+        else:
+            to_update.append(row)
+
+    ProfileLanguage.objects.bulk_create(to_create)
+    ProfileLanguage.objects.bulk_update(to_update, ["bytes", "repository_count"])
+    ProfileLanguage.objects.filter(pk__in=to_delete).delete()
+    transaction.on_commit(
+        lambda: profile_languages_changed.send(
+            sender=ProfileLanguage, profile_id=profile_id
+        )
+    )
+
+
+def store_repository_languages(repo, languages):
+    """
+    Replace a repository's breakdown with the ``{language: bytes}`` mapping
+    GitHub returned and fold the change into the profile totals. Returns
+    whether anything changed.
+    """
+    new = {language: int(size) for language, size in languages.items()}
+    with transaction.atomic():
+        old = dict(
+            RepositoryLanguage.objects.filter(repository=repo).values_list(
+                "language", "bytes"
+            )
+        )
+        changed = old != new
+        if changed:
+            RepositoryLanguage.objects.filter(repository=repo).exclude(
+                language__in=new
+            ).delete()
+            RepositoryLanguage.objects.bulk_create(
+                [
+                    RepositoryLanguage(repository=repo, language=language, bytes=size)
+                    for language, size in new.items()
+                ],
+                update_conflicts=True,
+                unique_fields=["repository", "language"],
+                update_fields=["bytes"],
+            )
+            apply_language_deltas(repo.github_profile_id, old, new)
+        mark_languages_synced(repo)
+    return changed
+
+
+def mark_languages_synced(repo):
+    repo.languages_synced_pushed_at = repo.pushed_at_github
+    Repository.objects.filter(pk=repo.pk).update(
+        languages_synced_pushed_at=repo.languages_synced_pushed_at
+    )
+
+
+def remove_repository_languages(repositories):
+    """
+    Take the breakdowns of ``repositories`` (a queryset) out of their
+    profiles' totals, before the repositories are deleted.
+    """
+    breakdowns = defaultdict(dict)
+    rows = RepositoryLanguage.objects.filter(repository__in=repositories).values_list(
+        "repository_id", "repository__github_profile_id", "language", "bytes"
+    )
+    with transaction.atomic():
+        for repo_id, profile_id, language, size in rows:
+            breakdowns[(repo_id, profile_id)][language] = size
+        for (_, profile_id), old in breakdowns.items():
+            apply_language_deltas(profile_id, old, {})
+
+
+def profile_language_breakdown(user_id):
+    """
+    Languages of a user's GitHub profile, largest first, with their share of
+    all bytes. Reads only the profile's aggregate rows.
+    """
+    rows = list(
+        ProfileLanguage.objects.filter(github_profile__user_id=user_id)
+        .order_by("-bytes")
+        .values("language", "bytes", "repository_count")
+    )
+    return _with_percentages(rows)
+
+
+def _with_percentages(rows):
+    total = sum(row["bytes"] for row in rows)
+    for row in rows:
+        row["percentage"] = round(row["bytes"] * 100 / total, 2) if total else 0.0
+    return rows
+
+
+def public_language_breakdown(user_id, include_forks=False):
+    """
+    Like profile_language_breakdown, but over the repositories a visitor may
+    see: private repositories, the profile's excluded_repos and (unless
+    ``include_forks``) forks are left out. Aggregates the per-repository rows,
+    so it is meant for building snapshots rather than per-request use.
+    """
+    profile = (
+        GithubProfile.objects.filter(user_id=user_id)
+        .values("id", "excluded_repos")
+        .first()
+    )
+    if profile is None:
+        return []
+    excluded = [name for name in profile["excluded_repos"] or [] if name]
+    repositories = Repository.objects.filter(
+        github_profile_id=profile["id"], is_private=False
+    ).exclude(Q(name__in=excluded) | Q(full_name__in=excluded))
+    if not include_forks:
+        repositories = repositories.filter(is_fork=False)
+
+    rows = list(
+        RepositoryLanguage.objects.filter(repository__in=repositories)
+        .values("language")
+        .annotate(bytes=Sum("bytes"), repository_count=Count("repository"))
+        .order_by("-bytes")
+    )
+    return _with_percentages(rows)
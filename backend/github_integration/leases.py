@@ -0,0 +1,193 @@
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import GithubProfile, SyncLease
+
+logger = logging.getLogger(__name__)
+
+# Data each sync type refreshes; a job covers a request whose scope is a
+# subset of its own.
+SYNC_SCOPES = {
+    "repositories": frozenset({"repositories"}),
+    "commits": frozenset({"commits"}),
+    "all": frozenset({"repositories", "commits"}),
+}
+
+
+def _sync_tasks():
+    # tasks imports sync, which must not depend on this module at import time.
+    from .tasks import sync_all_task, sync_commits_task, sync_repositories_task
+
+    return {
+        "repositories": sync_repositories_task,
+        "commits": sync_commits_task,
+        "all": sync_all_task,
+    }
+
+
+def _lease_ttl():
+    return timedelta(seconds=settings.GITHUB_SYNC_LEASE_TTL)
+
+
+def _covers(sync_type, full, requested_type, requested_full):
+    return SYNC_SCOPES[requested_type] <= SYNC_SCOPES[sync_type] and (
+        full or not requested_full
+    )
+
+
+def _merge(sync_type, other_type):
+    if sync_type is None:
+        return other_type
+    scope = SYNC_SCOPES[sync_type] | SYNC_SCOPES[other_type]
+    return next(name for name, names in SYNC_SCOPES.items() if names == scope)
+
+
+def start_sync(profile, sync_type, full=False, run_after=None):
+    """
+    Enqueue a sync of ``profile`` unless one is already running.
+
+    A request covered by the running job is collapsed into it; any other
+    request is merged into a single follow-up that the running job enqueues
+    when it releases the lease. Returns ``{"job_id", "deduplicated",
+    "follow_up"}`` where ``job_id`` is the job doing (or about to do) the work.
+    """
+    if sync_type == "repositories":
+        full = False
+    now = timezone.now()
+
+    with transaction.atomic():
+        lease, _ = SyncLease.objects.select_for_update().get_or_create(
+            github_profile=profile
+        )
+
+        if lease.is_held(now):
+            if _covers(lease.sync_type, lease.full, sync_type, full):
+                return {
+                    "job_id": lease.job_id,
+                    "deduplicated": True,
+                    "follow_up": False,
+                }
+            lease.pending_sync_type = _merge(lease.pending_sync_type, sync_type)
+            lease.pending_full = lease.pending_full or full
+            lease.save(
+                update_fields=["pending_sync_type", "pending_full", "updated_at"]
+            )
+            return {"job_id": lease.job_id, "deduplicated": True, "follow_up": True}
+
+        # A holder that expired never enqueued its follow-up; fold it in.
+        if lease.pending_sync_type:
+            sync_type = _merge(lease.pending_sync_type, sync_type)
+            full = full or lease.pending_full
+
+        task = _sync_tasks()[sync_type]
+        if run_after is not None:
+            task = task.using(run_after=run_after)
+        kwargs = {} if sync_type == "repositories" else {"full": full}
+        result = task.enqueue(profile.user_id, **kwargs)
+
+        # Backends that run the task inside enqueue() have already released it.
+        if result.is_finished:
+            lease.job_id = None
+            lease.expires_at = None
+        else:
+            lease.job_id = result.id
+            lease.expires_at = (run_after or now) + _lease_ttl()
+        lease.sync_type = sync_type
+        lease.full = full
+        lease.pending_sync_type = None
+        lease.pending_full = False
+        lease.save()
+
+    return {"job_id": result.id, "deduplicated": False, "follow_up": False}
+
+
+def acquire_lease(user_id, job_id, sync_type, full=False):
+    """
+    Take the profile's lease for ``job_id`` when it is free or already held
+    by that job. Returns False when another job holds it.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        profile = GithubProfile.objects.filter(user_id=user_id).only("id").first()
+        if profile is None:
+            # Nothing to deduplicate against; the sync reports the missing profile.
+            return True
+        lease, _ = SyncLease.objects.select_for_update().get_or_create(
+            github_profile=profile
+        )
+        if lease.is_held(now) and lease.job_id != job_id:
+            return False
+
+        lease.job_id = job_id
+        lease.sync_type = sync_type
+        lease.full = full
+        lease.expires_at = now + _lease_ttl()
+        lease.save(
+            update_fields=["job_id", "sync_type", "full", "expires_at", "updated_at"]
+        )
+    return True
+
+
+def release_lease(user_id, job_id):
+    """
+    Free the lease held by ``job_id`` and enqueue the follow-up collected
+    while it ran, if any.
+    """
+    with transaction.atomic():
+        lease = (
+            SyncLease.objects.select_for_update(of=("self",))
+            .select_related("github_profile")
+            .filter(github_profile__user_id=user_id, job_id=job_id)
+            .first()
+        )
+        if lease is None:
+            return None
+        pending_type, pending_full = lease.pending_sync_type, lease.pending_full
+        lease.job_id = None
+        lease.expires_at = None
+        lease.pending_sync_type = None
+        lease.pending_full = False
+        lease.save()
+
+    if pending_type:
+        follow_up = start_sync(lease.github_profile, pending_type, pending_full)
+        logger.info(f"Queued follow-up sync {follow_up['job_id']} for user {user_id}")
+        return follow_up
+    return None
+
+
+def defer_sync(user_id, sync_type, full, retry_at):
+    """
+    Enqueue ``sync_type`` again for ``retry_at`` (epoch seconds), for a job
+    that stopped because the rate limit would only free up after that.
+    """
+    profile = GithubProfile.objects.filter(user_id=user_id).first()
+    if profile is None:
+        return None
+    run_after = datetime.fromtimestamp(retry_at, tz=dt_timezone.utc)
+    job = start_sync(profile, sync_type, full=full, run_after=run_after)
+    logger.info(
+        f"Rate limit exhausted, sync of user {user_id} deferred to "
+        f"{run_after.isoformat()} as job {job['job_id']}"
+    )
+    return job
+
+
+@asynccontextmanager
+async def sync_lease(user_id, job_id, sync_type, full=False):
+    """
+    Hold the profile's lease around a sync job. Yields whether the lease was
+    acquired; a job that did not get it should skip its work.
+    """
+    acquired = await sync_to_async(acquire_lease)(user_id, job_id, sync_type, full)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            await sync_to_async(release_lease)(user_id, job_id)
@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from github_integration.models import GitHubSyncLog
+
+
+def _delete_in_batches(queryset, batch_size):
+    deleted = 0
+    while True:
+        pks = list(queryset.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        count, _ = GitHubSyncLog.objects.filter(pk__in=pks).delete()
+        deleted += count
+
+
+class Command(BaseCommand):
+    help = "Delete GitHub sync logs past their age or per-profile count limit."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Delete logs older than this many days "
+            "(defaults to GITHUB_SYNC_LOG_RETENTION_DAYS).",
+        )
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=None,
+            help="Logs kept per profile, newest first "
+            "(defaults to GITHUB_SYNC_LOG_KEEP_PER_PROFILE).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows deleted per statement.",
+        )
+
+    def handle(self, *args, **options):
+        days = options["days"]
+        if days is None:
+            days = settings.GITHUB_SYNC_LOG_RETENTION_DAYS
+        keep = options["keep"]
+        if keep is None:
+            keep = settings.GITHUB_SYNC_LOG_KEEP_PER_PROFILE
+
+        cutoff = timezone.now() - timedelta(days=days)
+        expired = _delete_in_batches(
+            GitHubSyncLog.objects.filter(started_at__lt=cutoff).order_by(),
+            options["batch_size"],
+        )
+
+        surplus = _delete_in_batches(
+            GitHubSyncLog.objects.annotate(
+                position=Window(
+                    RowNumber(),
+                    partition_by=F("github_profile"),
+                    order_by=F("started_at").desc(),
+                )
+            )
+            .filter(position__gt=keep)
+            .order_by(),
+            options["batch_size"],
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {expired} logs older than {days} days and {surplus} "
+                f"beyond the newest {keep} per profile."
+            )
+        )
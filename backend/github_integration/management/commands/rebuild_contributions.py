@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from github_integration.contributions import rebuild_contributions
+from github_integration.models import GithubProfile
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily contribution rollup from stored commits."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile",
+            action="append",
+            dest="usernames",
+            help="GitHub username to rebuild; repeat for several (defaults to all).",
+        )
+
+    def handle(self, *args, **options):
+        profiles = GithubProfile.objects.order_by("pk")
+        if options["usernames"]:
+            profiles = profiles.filter(github_username__in=options["usernames"])
+            if not profiles.exists():
+                raise CommandError("No matching GitHub profiles.")
+
+        for profile in profiles.iterator():
+            count = rebuild_contributions(profile)
+            self.stdout.write(f"{profile.github_username}: {count} days")
+        self.stdout.write(self.style.SUCCESS("Contribution rollup rebuilt."))
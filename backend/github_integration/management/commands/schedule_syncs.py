@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from github_integration.scheduler import schedule_due_syncs, schedule_token_checks
+
+
+class Command(BaseCommand):
+    help = "Enqueue GitHub syncs for profiles due according to their sync frequency."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and check for due profiles every --interval seconds.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=60,
+            help="Seconds between checks when running with --loop.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Profiles claimed per batch (defaults to GITHUB_SCHEDULER_BATCH_SIZE).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            enqueued = schedule_due_syncs(options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Enqueued {enqueued} syncs."))
+            checks = schedule_token_checks(options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Enqueued {checks} token checks."))
+
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,83 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current_metrics = ContextVar("github_sync_metrics", default=None)
+
+
+class SyncMetrics:
+    """
+    Counters, timings and per-repository outcomes of one logged sync, stored
+    on its GitHubSyncLog.
+
+    Times are wall-clock seconds summed over every call, so with concurrent
+    page fetches ``http_time`` can exceed the sync's duration.
+    """
+
+    COUNTERS = (
+        "requests",
+        "pages",
+        "not_modified",
+        "bytes_received",
+        "retries",
+        "rows_inserted",
+        "rows_updated",
+        "rows_unchanged",
+    )
+    TIMINGS = ("http_time", "parse_time", "db_time", "rate_limit_wait")
+
+    def __init__(self):
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+        for name in self.TIMINGS:
+            setattr(self, name, 0.0)
+        self.repo_outcomes = {}
+
+    def add(self, name, value=1):
+        setattr(self, name, getattr(self, name) + value)
+
+    def record_repo(self, full_name, synced, errors):
+        """Record the outcome of one repository of a multi-repository sync."""
+        outcome = {"synced": int(synced)}
+        if errors:
+            outcome["errors"] = len(errors)
+        self.repo_outcomes[full_name] = outcome
+
+    def record_skipped_repo(self, full_name, reason):
+        """Record a repository the sync left out, and why."""
+        self.repo_outcomes[full_name] = {"synced": 0, "skipped": reason}
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def as_dict(self):
+        data = {name: getattr(self, name) for name in self.COUNTERS}
+        data.update({name: round(getattr(self, name), 3) for name in self.TIMINGS})
+        return data
+
+
+def get_metrics():
+    """
+    Metrics of the sync running in the current context. Outside of a logged
+    sync a throwaway instance is returned so callers need no checks.
+    """
+    return _current_metrics.get() or SyncMetrics()
+
+
+@contextmanager
+def collect_metrics():
+    """
+    Collect metrics of everything run in this context, including tasks and
+    sync_to_async calls started from it, which inherit the context.
+    """
+    metrics = SyncMetrics()
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
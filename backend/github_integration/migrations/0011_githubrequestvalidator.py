@@ -0,0 +1,42 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("github_integration", "0010_remove_githubsynclog_stats_synced_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GitHubRequestValidator",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=64, unique=True)),
+                ("etag", models.CharField(blank=True, max_length=255, null=True)),
+                (
+                    "last_modified",
+                    models.CharField(blank=True, max_length=64, null=True),
+                ),
+                ("next_url", models.TextField(blank=True, null=True)),
+                ("last_url", models.TextField(blank=True, null=True)),
+                ("used_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["used_at"], name="github_inte_used_at_1a679b_idx"
+                    )
+                ],
+            },
+        ),
+    ]
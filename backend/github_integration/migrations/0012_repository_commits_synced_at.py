@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("github_integration", "0011_githubrequestvalidator"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="repository",
+            name="commits_synced_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
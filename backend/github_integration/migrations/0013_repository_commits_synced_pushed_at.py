@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("github_integration", "0012_repository_commits_synced_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="repository",
+            name="commits_synced_pushed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
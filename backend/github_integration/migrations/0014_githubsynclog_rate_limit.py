@@ -0,0 +1,22 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("github_integration", "0013_repository_commits_synced_pushed_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="githubsynclog",
+            name="rate_limit_remaining",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="githubsynclog",
+            name="rate_limit_reset_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
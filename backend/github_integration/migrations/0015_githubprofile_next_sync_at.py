@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("github_integration", "0014_githubsynclog_rate_limit"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="githubprofile",
+            name="next_sync_at",
+            field=models.DateTimeField(
+                blank=True, default=django.utils.timezone.now, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="githubprofile",
+            index=models.Index(
+                fields=["auto_sync", "next_sync_at"],
+                name="github_inte_auto_sy_39ba84_idx",
+            ),
+        ),
+    ]
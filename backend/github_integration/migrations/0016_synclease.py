@@ -0,0 +1,45 @@
+# Generated by Django 6.0.1 on 2026-10-18 13:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("github_integration", "0015_githubprofile_next_sync_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncLease",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("job_id", models.CharField(blank=True, max_length=64, null=True)),
+                ("sync_type", models.CharField(blank=True, max_length=20, null=True)),
+                ("full", models.BooleanField(default=False)),
+                ("expires_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "pending_sync_type",
+                    models.CharField(blank=True, max_length=20, null=True),
+                ),
+                ("pending_full", models.BooleanField(default=False)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "github_profile",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sync_lease",
+                        to="github_integration.githubprofile",
+                    ),
+                ),
+            ],
+        ),
+    ]
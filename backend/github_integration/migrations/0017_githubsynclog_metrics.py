@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("github_integration", "0016_synclease"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="githubsynclog",
+            name="metrics",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("github_integration", "0018_webhookdelivery"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="repository",
+            name="languages_synced_pushed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="RepositoryLanguage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("language", models.CharField(max_length=100)),
+                ("bytes", models.PositiveBigIntegerField(default=0)),
+                (
+                    "repository",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="languages",
+                        to="github_integration.repository",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("repository", "language")},
+            },
+        ),
+        migrations.CreateModel(
+            name="ProfileLanguage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("language", models.CharField(max_length=100)),
+                ("bytes", models.PositiveBigIntegerField(default=0)),
+                ("repository_count", models.PositiveIntegerField(default=0)),
+                (
+                    "github_profile",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="languages",
+                        to="github_integration.githubprofile",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["github_profile", "-bytes"],
+                        name="github_inte_github__8766a3_idx",
+                    )
+                ],
+                "unique_together": {("github_profile", "language")},
+            },
+        ),
+    ]
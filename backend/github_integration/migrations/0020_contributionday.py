@@ -0,0 +1,54 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("github_integration", "0019_repository_languages"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContributionDay",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("commit_count", models.PositiveIntegerField(default=0)),
+                (
+                    "github_profile",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="contribution_days",
+                        to="github_integration.githubprofile",
+                    ),
+                ),
+                (
+                    "repository",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="contribution_days",
+                        to="github_integration.repository",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["github_profile", "day"],
+                        name="github_inte_github__37769b_idx",
+                    )
+                ],
+                "unique_together": {("github_profile", "repository", "day")},
+            },
+        ),
+    ]
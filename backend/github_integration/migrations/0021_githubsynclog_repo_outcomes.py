@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("github_integration", "0020_contributionday"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="githubsynclog",
+            name="repo_outcomes",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name="githubsynclog",
+            name="started_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name="githubsynclog",
+            index=models.Index(
+                fields=["github_profile", "started_at"],
+                name="github_inte_github__1e83b0_idx",
+            ),
+        ),
+    ]
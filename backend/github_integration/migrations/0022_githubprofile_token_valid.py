@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("github_integration", "0021_githubsynclog_repo_outcomes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="githubprofile",
+            name="token_valid",
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name="githubprofile",
+            name="token_checked_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="githubprofile",
+            index=models.Index(
+                fields=["token_checked_at"], name="github_inte_token_c_57861e_idx"
+            ),
+        ),
+    ]
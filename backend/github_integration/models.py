@@ -1,5 +1,8 @@
+from datetime import timedelta
+
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.utils import timezone
 from encrypted_fields.fields import EncryptedCharField
 
 
@@ -11,6 +14,11 @@ class GithubProfile(models.Model):
         ("weekly", "Weekly"),
         ("manual", "Manual Only"),
     ]
+    SYNC_INTERVALS = {
+        "hourly": timedelta(hours=1),
+        "daily": timedelta(days=1),
+        "weekly": timedelta(weeks=1),
+    }
 
     user = models.OneToOneField(
         "authentication.User", on_delete=models.CASCADE, related_name="github_profile"
@@ -18,6 +26,9 @@ class GithubProfile(models.Model):
     github_username = models.CharField(max_length=255, unique=True)
     github_id = models.PositiveBigIntegerField(unique=True)
     access_token = EncryptedCharField(max_length=255, blank=True, null=True)
+    # Kept current by syncs and background checks rather than per request.
+    token_valid = models.BooleanField(default=True)
+    token_checked_at = models.DateTimeField(null=True, blank=True)
     avatar_url = models.URLField(blank=True, null=True)
     profile_url = models.URLField(blank=True, null=True)
 
@@ -49,6 +60,7 @@ class GithubProfile(models.Model):
     sync_frequency = models.CharField(
         max_length=20, choices=SYNC_FREQUENCY_CHOICES, default="daily"
     )
+    next_sync_at = models.DateTimeField(default=timezone.now, null=True, blank=True)
 
     # Repository Filtering
     show_forked_repos = models.BooleanField(default=False)
@@ -65,6 +77,8 @@ class GithubProfile(models.Model):
         verbose_name_plural = "GitHub Profiles"
         indexes = [
             models.Index(fields=["github_username"]),
+            models.Index(fields=["auto_sync", "next_sync_at"]),
+            models.Index(fields=["token_checked_at"]),
         ]
 
 
@@ -124,6 +138,9 @@ class Repository(models.Model):
 
     # Sync Info
     last_synced = models.DateTimeField(auto_now=True)
+    commits_synced_at = models.DateTimeField(null=True, blank=True)
+    commits_synced_pushed_at = models.DateTimeField(null=True, blank=True)
+    languages_synced_pushed_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return self.full_name
@@ -164,6 +181,70 @@ class Commit(models.Model):
         unique_together = ["repository", "sha"]
 
 
+class ContributionDay(models.Model):
+    """
+    Commits of a profile per repository and UTC day, maintained by the sync
+    as commits are inserted. Rebuild with ``manage.py rebuild_contributions``.
+    """
+
+    github_profile = models.ForeignKey(
+        GithubProfile, on_delete=models.CASCADE, related_name="contribution_days"
+    )
+    repository = models.ForeignKey(
+        Repository, on_delete=models.CASCADE, related_name="contribution_days"
+    )
+    day = models.DateField()
+    commit_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.github_profile.github_username} - {self.day}"
+
+    class Meta:
+        unique_together = ["github_profile", "repository", "day"]
+        indexes = [
+            models.Index(fields=["github_profile", "day"]),
+        ]
+
+
+class RepositoryLanguage(models.Model):
+    """Bytes of code per language in a repository, as reported by GitHub."""
+
+    repository = models.ForeignKey(
+        Repository, on_delete=models.CASCADE, related_name="languages"
+    )
+    language = models.CharField(max_length=100)
+    bytes = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.repository.full_name} - {self.language}"
+
+    class Meta:
+        unique_together = ["repository", "language"]
+
+
+class ProfileLanguage(models.Model):
+    """
+    Language totals over all repositories of a profile, kept up to date by
+    applying the change of each repository's breakdown when it is synced.
+    """
+
+    github_profile = models.ForeignKey(
+        GithubProfile, on_delete=models.CASCADE, related_name="languages"
+    )
+    language = models.CharField(max_length=100)
+    bytes = models.PositiveBigIntegerField(default=0)
+    repository_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.github_profile.github_username} - {self.language}"
+
+    class Meta:
+        unique_together = ["github_profile", "language"]
+        indexes = [
+            models.Index(fields=["github_profile", "-bytes"]),
+        ]
+
+
 class GitHubSyncLog(models.Model):
     STATUS_CHOICES = [
         ("success", "Success"),
@@ -182,7 +263,18 @@ class GitHubSyncLog(models.Model):
     commits_synced = models.IntegerField(default=0, blank=True)
     errors = models.JSONField(default=list, blank=True)
 
-    started_at = models.DateTimeField(auto_now_add=True)
+    # Rate-limit budget of the token when the sync finished
+    rate_limit_remaining = models.IntegerField(null=True, blank=True)
+    rate_limit_reset_at = models.DateTimeField(null=True, blank=True)
+
+    # Per-phase counters and timings, see github_integration.metrics
+    metrics = models.JSONField(default=dict, blank=True)
+    # {full_name: {"synced": n, "errors": n}} for each repository the run
+    # touched, so one log covers a whole multi-repository run.
+    repo_outcomes = models.JSONField(default=dict, blank=True)
+
+    # Set by the sync, as the log is only written once the run has finished.
+    started_at = models.DateTimeField(default=timezone.now)
     completed_at = models.DateTimeField(null=True, blank=True)
     duration = models.DurationField(null=True, blank=True)
 
@@ -195,4 +287,92 @@ class GitHubSyncLog(models.Model):
         ordering = ["-started_at"]
         indexes = [
             models.Index(fields=["github_profile", "sync_type", "status"]),
+            models.Index(fields=["github_profile", "started_at"]),
+        ]
+
+
+class GitHubRequestValidator(models.Model):
+    """
+    ETag / Last-Modified validators of a previously fetched GitHub API page,
+    keyed by a hash of the URL, query params and token.
+    """
+
+    key = models.CharField(max_length=64, unique=True)
+    etag = models.CharField(max_length=255, blank=True, null=True)
+    last_modified = models.CharField(max_length=64, blank=True, null=True)
+    next_url = models.TextField(blank=True, null=True)
+    last_url = models.TextField(blank=True, null=True)
+
+    used_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.key
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["used_at"]),
+        ]
+
+
+class SyncLease(models.Model):
+    """
+    Single-flight lease on a profile's sync. ``job_id`` is the task holding
+    it until ``expires_at``; requests arriving meanwhile are folded into at
+    most one follow-up, described by the ``pending_*`` fields.
+    """
+
+    github_profile = models.OneToOneField(
+        GithubProfile, on_delete=models.CASCADE, related_name="sync_lease"
+    )
+    job_id = models.CharField(max_length=64, blank=True, null=True)
+    sync_type = models.CharField(max_length=20, blank=True, null=True)
+    full = models.BooleanField(default=False)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    pending_sync_type = models.CharField(max_length=20, blank=True, null=True)
+    pending_full = models.BooleanField(default=False)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def is_held(self, now=None):
+        now = now or timezone.now()
+        return (
+            bool(self.job_id) and self.expires_at is not None and self.expires_at > now
+        )
+
+    def __str__(self):
+        return f"{self.github_profile.github_username} - {self.job_id or 'idle'}"
+
+
+class WebhookDelivery(models.Model):
+    """
+    A verified GitHub webhook delivery, stored on receipt and applied later
+    by ``process_webhook_task``.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("processed", "Processed"),
+        ("ignored", "Ignored"),
+        ("failed", "Failed"),
+    ]
+
+    delivery_id = models.CharField(max_length=64, unique=True)
+    event = models.CharField(max_length=50)
+    action = models.CharField(max_length=50, blank=True, null=True)
+    payload = models.JSONField()
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    error = models.TextField(blank=True, null=True)
+
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.event} - {self.delivery_id} - {self.status}"
+
+    class Meta:
+        ordering = ["-received_at"]
+        indexes = [
+            models.Index(fields=["status", "received_at"]),
         ]
@@ -0,0 +1,226 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone as dt_timezone
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised instead of waiting when the budget only frees up after more than
+    GITHUB_RATE_LIMIT_MAX_WAIT; ``retry_at`` is the epoch time it does.
+    """
+
+    def __init__(self, message, retry_at):
+        super().__init__(message)
+        self.retry_at = retry_at
+
+
+def request_resource(url):
+    """The rate-limit resource GitHub charges a request to ``url`` against."""
+    path = urlsplit(url).path
+    if path.endswith("/graphql"):
+        return "graphql"
+    if "/search/" in path:
+        return "search"
+    return "core"
+
+
+def is_rate_limited(response):
+    """Whether a response is GitHub refusing work because of a rate limit."""
+    if response.status_code == 429:
+        return True
+    if response.status_code != 403:
+        return False
+    return (
+        response.headers.get("x-ratelimit-remaining") == "0"
+        or "retry-after" in response.headers
+        or "rate limit" in response.text.lower()
+    )
+
+
+class RateLimitBucket:
+    """Rate-limit state of one GitHub resource (core, graphql, search...)."""
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self.blocked_until = 0.0
+        self.next_slot = 0.0
+
+
+class RateLimitGovernor:
+    """
+    Tracks GitHub's rate limits for one token from the headers of every
+    response, and holds back outgoing requests so the token stays inside its
+    budget:
+
+    * GITHUB_RATE_LIMIT_RESERVE requests are always left untouched;
+    * once fewer than GITHUB_RATE_LIMIT_PACE_BELOW of the limit remain, the
+      remaining budget is spread evenly until the window resets;
+    * after a primary or secondary limit hit, requests are parked until the
+      reset time or Retry-After has passed.
+
+    GitHub counts each resource (``x-ratelimit-resource``) separately, so a
+    bucket is kept per resource and an exhausted GraphQL budget does not hold
+    back REST requests.
+
+    State is guarded by a thread lock rather than an asyncio one so a single
+    governor can be shared by syncs running on different event loops.
+    """
+
+    # GitHub asks to wait at least a minute after a secondary limit that
+    # carries no Retry-After header.
+    secondary_limit_wait = 60
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def _bucket(self, resource):
+        bucket = self._buckets.get(resource)
+        if bucket is None:
+            bucket = self._buckets[resource] = RateLimitBucket()
+        return bucket
+
+    def _reserve(self, resource, now):
+        """
+        Returns ``(delay, reserved)``. When ``reserved`` is set a request slot
+        was taken and the caller only has to wait ``delay``; otherwise it has
+        to wait and ask again.
+        """
+        with self._lock:
+            bucket = self._bucket(resource)
+            if bucket.reset_at is not None and now >= bucket.reset_at:
+                # The window rolled over; the next response reports the new one.
+                bucket.remaining = None
+                bucket.reset_at = None
+
+            if bucket.blocked_until > now:
+                return bucket.blocked_until - now, False
+
+            if bucket.remaining is None:
+                return 0, True
+
+            budget = bucket.remaining - settings.GITHUB_RATE_LIMIT_RESERVE
+            if budget <= 0:
+                return bucket.reset_at - now, False
+
+            # Counted locally so concurrent requests do not all spend the
+            # same unit of budget before their responses come back.
+            bucket.remaining -= 1
+
+            if (
+                bucket.limit
+                and bucket.remaining
+                < bucket.limit * settings.GITHUB_RATE_LIMIT_PACE_BELOW
+            ):
+                slot = max(now, bucket.next_slot)
+                bucket.next_slot = slot + (bucket.reset_at - now) / budget
+                return slot - now, True
+            return 0, True
+
+    async def acquire(self, resource="core"):
+        """
+        Wait until a request to ``resource`` may be sent. Returns the time
+        spent waiting. Raises RateLimitExceeded when that would take longer
+        than GITHUB_RATE_LIMIT_MAX_WAIT, so the caller can reschedule its work
+        for ``retry_at`` instead of holding a worker slot until then.
+        """
+        waited = 0.0
+        while True:
+            now = time.time()
+            delay, reserved = self._reserve(resource, now)
+            if delay > settings.GITHUB_RATE_LIMIT_MAX_WAIT:
+                raise RateLimitExceeded(
+                    f"Rate limit budget of {resource} exhausted for "
+                    f"{round(delay)}s, longer than GITHUB_RATE_LIMIT_MAX_WAIT",
+                    retry_at=now + delay,
+                )
+            if delay > 0:
+                await asyncio.sleep(delay)
+                waited += delay
+            if reserved:
+                return waited
+
+    def update(self, response, resource="core"):
+        """
+        Record the rate-limit headers of a response to a request made against
+        ``resource``; the response's own ``x-ratelimit-resource`` wins.
+        """
+        headers = response.headers
+        now = time.time()
+        resource = headers.get("x-ratelimit-resource") or resource
+        with self._lock:
+            bucket = self._bucket(resource)
+            remaining = headers.get("x-ratelimit-remaining")
+            reset = headers.get("x-ratelimit-reset")
+            limit = headers.get("x-ratelimit-limit")
+            if remaining is not None and reset is not None:
+                remaining, reset = int(remaining), float(reset)
+                if bucket.reset_at != reset or bucket.remaining is None:
+                    bucket.remaining = remaining
+                else:
+                    # Responses of concurrent requests arrive out of order;
+                    # the lowest count is the most recent one.
+                    bucket.remaining = min(bucket.remaining, remaining)
+                bucket.reset_at = reset
+                if limit is not None:
+                    bucket.limit = int(limit)
+
+            if not is_rate_limited(response):
+                return
+
+            retry_after = headers.get("retry-after")
+            if retry_after is not None:
+                blocked_until = now + float(retry_after)
+            elif remaining is not None and int(remaining) == 0 and reset is not None:
+                blocked_until = float(reset)
+            else:
+                blocked_until = now + self.secondary_limit_wait
+            bucket.blocked_until = max(bucket.blocked_until, blocked_until)
+
+        logger.info(
+            f"GitHub rate limit of {resource} hit, parking requests for "
+            f"{round(bucket.blocked_until - now)}s"
+        )
+
+    def snapshot(self, resource="core"):
+        with self._lock:
+            bucket = self._bucket(resource)
+            return {
+                "limit": bucket.limit,
+                "remaining": bucket.remaining,
+                "reset_at": datetime.fromtimestamp(bucket.reset_at, tz=dt_timezone.utc)
+                if bucket.reset_at
+                else None,
+            }
+
+
+# Governors of the most recently used tokens. Evicting one only forgets what
+# the last responses said; the next response to that token restores it.
+_governors = OrderedDict()
+_governors_lock = threading.Lock()
+MAX_GOVERNORS = 1024
+
+
+def get_governor(token):
+    """Return the process-wide governor of a token."""
+    key = hashlib.sha256((token or "").encode()).hexdigest()
+    with _governors_lock:
+        governor = _governors.get(key)
+        if governor is None:
+            governor = _governors[key] = RateLimitGovernor()
+            while len(_governors) > MAX_GOVERNORS:
+                _governors.popitem(last=False)
+        else:
+            _governors.move_to_end(key)
+        return governor
@@ -0,0 +1,76 @@
+import random
+
+import httpx
+from django.conf import settings
+
+from .ratelimit import is_rate_limited
+
+
+class RetryBudget:
+    """
+    Retries a whole sync may spend across all of its requests, so a GitHub
+    outage fails the sync quickly instead of retrying every page to the max.
+    """
+
+    def __init__(self, retries=None):
+        self.remaining = settings.GITHUB_RETRY_BUDGET if retries is None else retries
+
+    def consume(self):
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed attempt is retried and how long to wait first.
+
+    ``status_rules`` maps retryable status codes to their maximum number of
+    attempts (None meaning GITHUB_RETRY_MAX_ATTEMPTS). Rate-limited 403/429
+    responses and transport errors (timeouts, resets) are retried as well.
+    Delays use exponential backoff with full jitter unless the response says
+    how long to wait with Retry-After.
+    """
+
+    status_rules = {
+        429: None,
+        500: 2,
+        502: None,
+        503: None,
+        504: None,
+    }
+
+    def __init__(self, max_attempts=None, base_delay=None, max_delay=None):
+        self.max_attempts = max_attempts or settings.GITHUB_RETRY_MAX_ATTEMPTS
+        self.base_delay = base_delay or settings.GITHUB_RETRY_BASE_DELAY
+        self.max_delay = max_delay or settings.GITHUB_RETRY_MAX_DELAY
+
+    def _max_attempts_for(self, response=None, exception=None):
+        if exception is not None:
+            return (
+                self.max_attempts if isinstance(exception, httpx.TransportError) else 0
+            )
+        if response.status_code in self.status_rules:
+            return self.status_rules[response.status_code] or self.max_attempts
+        if is_rate_limited(response):
+            return self.max_attempts
+        return 0
+
+    def should_retry(self, attempt, response=None, exception=None):
+        return attempt < self._max_attempts_for(response, exception)
+
+    def delay(self, attempt, response=None):
+        """
+        Seconds to wait before the next attempt. Rate-limited responses
+        return 0 as the rate-limit governor already parks them.
+        """
+        if response is not None:
+            if is_rate_limited(response):
+                return 0
+            retry_after = response.headers.get("retry-after")
+            if retry_after is not None and retry_after.isdigit():
+                return min(float(retry_after), self.max_delay)
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        )
@@ -0,0 +1,119 @@
+import logging
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import GithubProfile
+from .leases import start_sync
+from .tasks import sync_all_task, validate_token_task
+
+logger = logging.getLogger(__name__)
+
+
+def next_sync_time(profile, now):
+    """
+    Next time a profile is due, pushed back by a random share of its interval
+    so profiles synced together drift apart over time.
+    """
+    interval = GithubProfile.SYNC_INTERVALS.get(profile.sync_frequency)
+    if interval is None:
+        return None
+    jitter = interval * random.uniform(0, settings.GITHUB_SCHEDULER_JITTER)
+    return now + interval + jitter
+
+
+def claim_due_profiles(now, batch_size):
+    """
+    Lock and reschedule up to ``batch_size`` due profiles. Served by the
+    (auto_sync, next_sync_at) index, so only due rows are read; locked rows
+    are skipped so several schedulers can run side by side.
+    """
+    with transaction.atomic():
+        profiles = list(
+            GithubProfile.objects.select_for_update(skip_locked=True)
+            .filter(auto_sync=True, next_sync_at__lte=now)
+            .exclude(sync_frequency="manual")
+            .exclude(access_token__isnull=True)
+            .exclude(token_valid=False)
+            .order_by("next_sync_at")
+            .only("id", "user_id", "sync_frequency", "next_sync_at")[:batch_size]
+        )
+        for profile in profiles:
+            profile.next_sync_at = next_sync_time(profile, now)
+        GithubProfile.objects.bulk_update(profiles, ["next_sync_at"])
+    return profiles
+
+
+def enqueue_sync(profile, now):
+    run_after = None
+    if sync_all_task.get_backend().supports_defer:
+        # Spread the start of a batch instead of firing it all at once.
+        delay = random.uniform(0, settings.GITHUB_SCHEDULER_SPREAD)
+        run_after = now + timedelta(seconds=delay)
+    return start_sync(profile, "all", run_after=run_after)
+
+
+def schedule_due_syncs(batch_size=None):
+    """Enqueue a sync for every due profile, batch by batch. Returns the count."""
+    batch_size = batch_size or settings.GITHUB_SCHEDULER_BATCH_SIZE
+    now = timezone.now()
+    enqueued = 0
+
+    while True:
+        profiles = claim_due_profiles(now, batch_size)
+        for profile in profiles:
+            try:
+                enqueue_sync(profile, now)
+                enqueued += 1
+            except Exception as e:
+                logger.error(f"Failed to enqueue sync for profile {profile.id}: {e}")
+
+        if len(profiles) < batch_size:
+            return enqueued
+
+
+def schedule_token_checks(batch_size=None):
+    """
+    Enqueue a token check for every profile whose token was last checked more
+    than GITHUB_TOKEN_CHECK_INTERVAL ago. Returns the count.
+
+    token_checked_at is pushed to now when a check is enqueued, so later
+    passes do not enqueue it again; the check overwrites it when it runs.
+    Profiles that sync regularly are kept current by their syncs and rarely
+    need one.
+    """
+    batch_size = batch_size or settings.GITHUB_SCHEDULER_BATCH_SIZE
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=settings.GITHUB_TOKEN_CHECK_INTERVAL)
+    enqueued = 0
+
+    while True:
+        with transaction.atomic():
+            profiles = list(
+                GithubProfile.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(token_checked_at__isnull=True) | Q(token_checked_at__lt=cutoff)
+                )
+                .exclude(access_token__isnull=True)
+                .order_by("token_checked_at")
+                .only("id", "user_id", "token_checked_at")[:batch_size]
+            )
+            for profile in profiles:
+                profile.token_checked_at = now
+            GithubProfile.objects.bulk_update(profiles, ["token_checked_at"])
+
+        for profile in profiles:
+            try:
+                validate_token_task.enqueue(profile.user_id)
+                enqueued += 1
+            except Exception as e:
+                logger.error(
+                    f"Failed to enqueue token check for profile {profile.id}: {e}"
+                )
+
+        if len(profiles) < batch_size:
+            return enqueued
@@ -3,3 +3,56 @@ from rest_framework import serializers
 
 class SyncNowResponseSerializer(serializers.Serializer):
     message = serializers.CharField()
+    job_id = serializers.CharField(
+        help_text="Id of the task doing the sync; an already running job's id "
+        "when the request was deduplicated."
+    )
+    deduplicated = serializers.BooleanField(
+        help_text="A sync of this profile was already running."
+    )
+    follow_up = serializers.BooleanField(
+        help_text="The request was queued to run once the running sync finishes."
+    )
+
+
+class SyncRequestSerializer(serializers.Serializer):
+    full = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Re-fetch the full commit history instead of only new commits.",
+    )
+
+
+class WebhookAckSerializer(serializers.Serializer):
+    message = serializers.CharField()
+
+
+class LanguageBreakdownSerializer(serializers.Serializer):
+    language = serializers.CharField()
+    bytes = serializers.IntegerField()
+    repository_count = serializers.IntegerField()
+    percentage = serializers.FloatField()
+
+
+class ContributionRequestSerializer(serializers.Serializer):
+    days = serializers.IntegerField(
+        required=False,
+        default=365,
+        min_value=1,
+        max_value=366,
+        help_text="Number of days to return, ending today (UTC).",
+    )
+
+
+class ContributionDaySerializer(serializers.Serializer):
+    date = serializers.DateField(source="day")
+    count = serializers.IntegerField()
+
+
+class ContributionCalendarSerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+    total = serializers.IntegerField()
+    days = ContributionDaySerializer(
+        many=True, help_text="Days with at least one commit, oldest first."
+    )
@@ -0,0 +1,22 @@
+from django.dispatch import Signal, receiver
+
+from core.signals import worker_stopping
+
+from .http_client import close_http_client
+
+# Sent with ``profile_id`` after a change to a profile's language totals has
+# been committed.
+profile_languages_changed = Signal()
+
+# Sent with ``user_id``, ``sync_type`` and ``status`` once a sync has finished
+# and its log has been written.
+sync_finished = Signal()
+
+# Sent with ``user_ids`` and ``event`` once a webhook delivery has been
+# applied to the repositories of those users.
+webhook_applied = Signal()
+
+
+@receiver(worker_stopping)
+async def close_worker_http_client(sender, **kwargs):
+    await close_http_client()
@@ -1,25 +1,125 @@
-import httpx
+import asyncio
+import contextlib
+import logging
+import weakref
+from collections import deque
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
+
 from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.db import transaction
+from django.db.models import F, Max, Q
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 
+from .conditional import get_validator_store, validator_key
+from .contributions import add_contributions
+from .http_client import get_http_client, get_request_semaphore
+from .languages import mark_languages_synced, store_repository_languages
+from .metrics import collect_metrics, get_metrics
 from .models import GithubProfile, GitHubSyncLog, Repository, Commit
+from .ratelimit import RateLimitExceeded, get_governor, request_resource
+from .retry import RetryBudget, RetryPolicy
+from .signals import sync_finished
+from .tokens import record_token_check
+
+logger = logging.getLogger(__name__)
+
+REPOSITORY_UPSERT = {
+    "model": Repository,
+    "unique_fields": ["github_profile", "github_id"],
+    "update_fields": [
+        "name",
+        "full_name",
+        "description",
+        "html_url",
+        "clone_url",
+        "git_url",
+        "stars_count",
+        "forks_count",
+        "watchers_count",
+        "open_issues_count",
+        "language",
+        "topics",
+        "is_private",
+        "is_fork",
+        "is_archived",
+        "created_at_github",
+        "updated_at_github",
+        "pushed_at_github",
+        "last_synced",
+    ],
+}
+
+COMMIT_UPSERT = {
+    "model": Commit,
+    "unique_fields": ["repository", "sha"],
+    "update_fields": ["github_profile", "message", "date"],
+    # Called with the newly inserted rows, in the same transaction.
+    "on_insert": add_contributions,
+}
+
+# One semaphore per event loop, i.e. per worker process, capping the number of
+# repositories being synced at once across every profile the worker handles.
+_global_sync_semaphores = weakref.WeakKeyDictionary()
+
+
+def _get_global_sync_semaphore():
+    loop = asyncio.get_running_loop()
+    semaphore = _global_sync_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(settings.GITHUB_SYNC_GLOBAL_CONCURRENCY)
+        _global_sync_semaphores[loop] = semaphore
+    return semaphore
 
 
 class GithubAPIClient:
-    def __init__(self, token):
+    # Retried attempts kept on the client for inspection; the count in
+    # ``retries`` is not capped.
+    max_recorded_attempts = 100
+
+    def __init__(
+        self,
+        token,
+        http_client=None,
+        validator_store=None,
+        retry_policy=None,
+        profile_id=None,
+    ):
         self.token = token
+        self.profile_id = profile_id
+        self._http_client = http_client
+        self.validator_store = validator_store or get_validator_store()
+        self.governor = get_governor(token)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_budget = RetryBudget()
+        self.retries = 0
+        self.attempts = []
+        # What GitHub's responses said about the token: None until a request
+        # got through, False once one was refused with 401.
+        self.token_valid = None
+        # Epoch time the rate limit frees up, once a request was refused
+        # because waiting for it would take longer than the max wait.
+        self.deferred_until = None
         self.base_url = settings.GITHUB_BASE_URL
+        self.graphql_url = settings.GITHUB_GRAPHQL_URL
         self.headers = {
             "Authorization": f"token {self.token}",
             "Accept": "application/vnd.github.v3+json",
         }
 
+    @property
+    def http_client(self):
+        """
+        The injected client if one was given (e.g. one bound to a local
+        stand-in server), otherwise the pooled client shared by the worker.
+        """
+        return self._http_client or get_http_client()
+
     async def _handle_response(self, response):
         if response.status_code == 200:
-            return response.json(), None
+            with get_metrics().timer("parse_time"):
+                return response.json(), None
 
         error_msg = response.text[:500]
         if response.status_code == 403 and "rate limit" in error_msg.lower():
@@ -30,47 +130,594 @@ class GithubAPIClient:
             error_msg = f"Too many requests. Reset at {reset_time}"
         return None, {"status_code": response.status_code, "error": error_msg}
 
-    async def fetch_all(self, url, params=None):
+    def _record_attempt(self, url, attempt, response=None, error=None, delay=0):
+        self.retries += 1
+        get_metrics().add("retries")
+        if len(self.attempts) < self.max_recorded_attempts:
+            self.attempts.append(
+                {
+                    "url": url,
+                    "attempt": attempt,
+                    "status_code": response.status_code if response else None,
+                    "error": error,
+                    "delay": round(delay, 3),
+                }
+            )
+
+    async def _request(self, method, url, **kwargs):
+        """
+        Send one request through the token's rate-limit governor, retrying
+        per the retry policy while the sync's retry budget lasts. Since this
+        works on a single request, a listing resumes from the page that failed
+        rather than starting over.
+        """
+        metrics = get_metrics()
+        resource = request_resource(url)
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                waited = await self.governor.acquire(resource)
+            except RateLimitExceeded as e:
+                self.deferred_until = max(self.deferred_until or 0, e.retry_at)
+                raise
+            metrics.add("rate_limit_wait", waited)
+            try:
+                async with get_request_semaphore():
+                    metrics.add("requests")
+                    with metrics.timer("http_time"):
+                        resp = await self.http_client.request(method, url, **kwargs)
+                metrics.add("bytes_received", resp.num_bytes_downloaded)
+            except Exception as e:
+                if not (
+                    self.retry_policy.should_retry(attempt, exception=e)
+                    and self.retry_budget.consume()
+                ):
+                    raise
+                delay = self.retry_policy.delay(attempt)
+                self._record_attempt(url, attempt, error=str(e), delay=delay)
+                await asyncio.sleep(delay)
+                continue
+
+            self.governor.update(resp, resource)
+            if resp.status_code == 401:
+                self.token_valid = False
+            elif resp.status_code < 400 and self.token_valid is None:
+                self.token_valid = True
+            if not (
+                self.retry_policy.should_retry(attempt, response=resp)
+                and self.retry_budget.consume()
+            ):
+                return resp
+
+            delay = self.retry_policy.delay(attempt, resp)
+            self._record_attempt(url, attempt, response=resp, delay=delay)
+            await asyncio.sleep(delay)
+
+    async def graphql(self, query, variables=None):
+        """
+        Run a GraphQL query. Returns ``(data, error)``; GraphQL-level errors
+        reported with a 200 status are surfaced as an error too.
+        """
+        try:
+            resp = await self._request(
+                "POST",
+                self.graphql_url,
+                headers=self.headers,
+                json={"query": query, "variables": variables or {}},
+            )
+        except Exception as e:
+            return None, {"url": self.graphql_url, "error": str(e)}
+
+        body, error = await self._handle_response(resp)
+        if error:
+            return None, {"url": self.graphql_url, **error}
+        get_metrics().add("pages")
+        if body.get("errors"):
+            messages = "; ".join(err.get("message", "") for err in body["errors"])
+            return body.get("data"), {"url": self.graphql_url, "error": messages}
+        return body.get("data"), None
+
+    async def check_token(self):
+        """
+        Ask GitHub whether the token works. Returns None when GitHub could
+        not give a definite answer (network errors, 5xx, rate limiting).
+        """
+        try:
+            resp = await self._request(
+                "GET", f"{self.base_url}/user", headers=self.headers
+            )
+        except Exception as e:
+            logger.warning(f"Token check failed: {e}")
+            return None
+        if resp.status_code == 401:
+            return False
+        if resp.status_code == 200:
+            return True
+        return None
+
+    async def _conditional_headers(self, url, params):
+        """
+        Build If-None-Match / If-Modified-Since headers from stored validators.
+        Returns the headers, the validator key and the stored record.
+        """
+        key = validator_key(url, params, self.token, self.profile_id)
+        record = await self.validator_store.get(key)
+        headers = dict(self.headers)
+        if record:
+            if record.get("etag"):
+                headers["If-None-Match"] = record["etag"]
+            if record.get("last_modified"):
+                headers["If-Modified-Since"] = record["last_modified"]
+        return headers, key, record
+
+    def paginate(self, url, params=None, conditional=True, parallel=False):
+        """
+        Iterate over the pages of a listing as they arrive, see PageIterator.
+        """
+        return PageIterator(self, url, params, conditional, parallel)
+
+    async def fetch_all(self, url, params=None, conditional=True):
+        """
+        Fetch every page of a listing into a single list. Prefer paginate()
+        for listings that can be processed page by page. Validators are stored
+        as pages are collected, so callers should not use this for listings
+        fetched conditionally and persisted afterwards.
+        """
+        pages = self.paginate(url, params, conditional)
         results = []
-        errors = []
-        async with httpx.AsyncClient() as client:
-            current_url = url
-            current_params = params
-            while current_url:
+        async for page in pages:
+            results.extend(page)
+            await pages.mark_persisted()
+        return results, pages.errors
+
+
+class PageFetchError(Exception):
+    def __init__(self, error):
+        super().__init__(error.get("error"))
+        self.error = error
+
+
+class PageIterator:
+    """
+    Async iterator over the pages of a GitHub listing, each page being the
+    list of items it contains, always in page order.
+
+    With ``conditional`` set, pages GitHub answers with 304 Not Modified are
+    skipped (they are unchanged since the last fetch and do not count against
+    the rate limit) and pagination continues from the stored links, asking
+    for one page more after an unchanged last page in case the listing grew.
+    A page's validators are only stored once the consumer reports it saved
+    through ``mark_persisted()``, so a page that failed to save is fetched in
+    full again next time instead of being answered with 304.
+
+    With ``parallel`` set and a ``rel="last"`` link on the first page, the
+    remaining pages are requested concurrently, at most
+    GITHUB_PAGE_FETCH_CONCURRENCY ahead of the page being consumed.
+
+    A failure ends the iteration early and is collected on ``errors`` instead
+    of being raised, like the rest of the sync error reporting.
+    """
+
+    def __init__(self, client, url, params=None, conditional=True, parallel=False):
+        self.client = client
+        self.url = url
+        self.params = params
+        self.conditional = conditional and client.validator_store is not None
+        self.parallel = parallel
+        self.errors = []
+        # Validators of the yielded pages not yet marked persisted, in page
+        # order; None for pages that came without any.
+        self._unpersisted = deque()
+
+    def __aiter__(self):
+        return self._pages()
+
+    async def mark_persisted(self, store=True):
+        """
+        Settle the oldest yielded page not yet settled. Call exactly once per
+        page after trying to save it, with ``store`` false when the save
+        failed: its validators are then dropped so the page is fetched in
+        full next time, and later pages keep their own.
+        """
+        if not self._unpersisted:
+            return
+        validators = self._unpersisted.popleft()
+        if store and validators is not None:
+            await self.client.validator_store.set(*validators)
+
+    async def _fetch_page(self, url, params):
+        """
+        Fetch one page. Returns ``(items, links, validators)`` with ``items``
+        set to None for a page that has not been modified, and
+        ``validators`` the ``(key, record)`` to store once the page is saved.
+        Raises PageFetchError.
+        """
+        client = self.client
+        try:
+            headers, key, record = client.headers, None, None
+            if self.conditional:
+                headers, key, record = await client._conditional_headers(url, params)
+
+            resp = await client._request("GET", url, headers=headers, params=params)
+
+            if resp.status_code == 304 and record:
+                get_metrics().add("not_modified")
+                links = {
+                    "next": record.get("next_url"),
+                    "last": record.get("last_url"),
+                }
+                return None, links, None
+
+            data, error = await client._handle_response(resp)
+            if error:
+                raise PageFetchError({"url": url, **error})
+            get_metrics().add("pages")
+
+            links = {
+                "next": resp.links.get("next", {}).get("url"),
+                "last": resp.links.get("last", {}).get("url"),
+            }
+
+            validators = None
+            etag = resp.headers.get("etag")
+            last_modified = resp.headers.get("last-modified")
+            if key and (etag or last_modified):
+                validators = (
+                    key,
+                    {
+                        "etag": etag,
+                        "last_modified": last_modified,
+                        "next_url": links["next"],
+                        "last_url": links["last"],
+                    },
+                )
+            return data, links, validators
+        except PageFetchError:
+            raise
+        except Exception as e:
+            raise PageFetchError({"url": url, "error": str(e)})
+
+    @staticmethod
+    def _remaining_page_urls(links):
+        """
+        URLs of pages 2..last derived from the first page's links, or None if
+        the listing is not paginated by page number.
+        """
+        if not links.get("next") or not links.get("last"):
+            return None
+        next_url = urlsplit(links["next"])
+        last_url = urlsplit(links["last"])
+        next_query = parse_qs(next_url.query)
+        last_query = parse_qs(last_url.query)
+        if next_query.get("page") != ["2"] or "page" not in last_query:
+            return None
+
+        urls = []
+        for number in range(2, int(last_query["page"][0]) + 1):
+            last_query["page"] = [str(number)]
+            urls.append(
+                urlunsplit(last_url._replace(query=urlencode(last_query, doseq=True)))
+            )
+        return urls
+
+    @staticmethod
+    def _page_after(url, params):
+        """
+        URL of the page after ``url`` in a listing paginated by page number,
+        or None for a response that is not such a listing.
+        """
+        parts = urlsplit(url)
+        query = parse_qs(parts.query)
+        query.update({key: [str(value)] for key, value in (params or {}).items()})
+        if "page" not in query and "per_page" not in query:
+            return None
+        page = query.get("page", ["1"])[0]
+        if not page.isdigit():
+            return None
+        query["page"] = [str(int(page) + 1)]
+        return urlunsplit(parts._replace(query=urlencode(query, doseq=True)))
+
+    def _next_url(self, url, params, data, links, probing):
+        """
+        Where pagination continues after a page. The links of a 304 are the
+        stored ones, and an ETag only covers the body: a listing that grew
+        behind an unchanged last page has a next page those links do not
+        show, so the page after it is asked for once.
+        """
+        if links["next"]:
+            return links["next"], False
+        if data is None and not probing:
+            return self._page_after(url, params), True
+        return None, False
+
+    async def _fan_out(self, urls):
+        """
+        Yield pages ``urls`` concurrently, in order. The last page fetched is
+        left on ``_fan_out_tail`` as ``(url, items, links)`` so pagination can
+        carry on past it.
+        """
+        window = deque()
+        remaining = iter(urls)
+        self._fan_out_tail = None
+
+        def schedule():
+            url = next(remaining, None)
+            if url:
+                window.append((url, asyncio.ensure_future(self._fetch_page(url, None))))
+
+        for _ in range(settings.GITHUB_PAGE_FETCH_CONCURRENCY):
+            schedule()
+
+        try:
+            while window:
+                url, future = window.popleft()
                 try:
-                    resp = await client.get(
-                        current_url, headers=self.headers, params=current_params
-                    )
-                    data, error = await self._handle_response(resp)
+                    data, links, validators = await future
+                except PageFetchError as e:
+                    self.errors.append(e.error)
+                    return
+                schedule()
+                self._fan_out_tail = (url, data, links)
+                if data is not None:
+                    self._unpersisted.append(validators)
+                    yield data
+        finally:
+            for _, pending in window:
+                pending.cancel()
+
+    async def _pages(self):
+        current_url = self.url
+        current_params = self.params
+        first_page = True
+        probing = False
+        while current_url:
+            try:
+                data, links, validators = await self._fetch_page(
+                    current_url, current_params
+                )
+            except PageFetchError as e:
+                self.errors.append(e.error)
+                return
 
-                    if error:
-                        errors.append({"url": current_url, **error})
-                        break
+            if data is not None:
+                self._unpersisted.append(validators)
+                yield data
 
-                    results.extend(data)
-                    current_url = resp.links.get("next", {}).get("url")
+            if self.parallel and first_page:
+                urls = self._remaining_page_urls(links)
+                if urls is not None:
+                    error_count = len(self.errors)
+                    async for page in self._fan_out(urls):
+                        yield page
+                    if len(self.errors) > error_count:
+                        return
+                    # The last page may have been reached through stale links;
+                    # carry on from it like from any other page.
+                    current_url, data, links = self._fan_out_tail
                     current_params = None
-                except Exception as e:
-                    errors.append({"url": current_url, "error": str(e)})
-                    break
-        return results, errors
+
+            first_page = False
+            current_url, probing = self._next_url(
+                current_url, current_params, data, links, probing
+            )
+            current_params = None
+
+
+VIEWER_QUERY = """
+query {
+  viewer {
+    id
+    login
+  }
+}
+"""
+
+REPOSITORIES_QUERY = """
+query($cursor: String, $pageSize: Int!, $commitCount: Int!, $authorId: ID!) {
+  viewer {
+    repositories(
+      first: $pageSize
+      after: $cursor
+      ownerAffiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER]
+    ) {
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+      nodes {
+        databaseId
+        name
+        nameWithOwner
+        description
+        url
+        stargazerCount
+        forkCount
+        watchers {
+          totalCount
+        }
+        issues(states: OPEN) {
+          totalCount
+        }
+        pullRequests(states: OPEN) {
+          totalCount
+        }
+        primaryLanguage {
+          name
+        }
+        repositoryTopics(first: 20) {
+          nodes {
+            topic {
+              name
+            }
+          }
+        }
+        isPrivate
+        isFork
+        isArchived
+        createdAt
+        updatedAt
+        pushedAt
+        defaultBranchRef {
+          target {
+            ... on Commit {
+              history(first: $commitCount, author: {id: $authorId}) {
+                pageInfo {
+                  hasNextPage
+                }
+                nodes {
+                  oid
+                  message
+                  authoredDate
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+class GraphQLSyncEngine:
+    """
+    Fetches repositories together with their topics, primary language and
+    recent default-branch history through the GraphQL API, many repositories
+    per request. Records are returned in the shape of the REST payloads so
+    they go through the same persistence as the REST flow.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    @staticmethod
+    def _repo_record(node):
+        url = node.get("url") or ""
+        return {
+            "id": node.get("databaseId"),
+            "name": node.get("name"),
+            "full_name": node.get("nameWithOwner"),
+            "description": node.get("description"),
+            "html_url": url,
+            "clone_url": f"{url}.git",
+            "git_url": f"git://{url.split('://', 1)[-1]}.git",
+            "stargazers_count": node.get("stargazerCount", 0),
+            "forks_count": node.get("forkCount", 0),
+            "watchers_count": (node.get("watchers") or {}).get("totalCount", 0),
+            "open_issues_count": (node.get("issues") or {}).get("totalCount", 0)
+            + (node.get("pullRequests") or {}).get("totalCount", 0),
+            "language": (node.get("primaryLanguage") or {}).get("name"),
+            "topics": [
+                topic["topic"]["name"]
+                for topic in (node.get("repositoryTopics") or {}).get("nodes", [])
+            ],
+            "private": node.get("isPrivate", False),
+            "fork": node.get("isFork", False),
+            "archived": node.get("isArchived", False),
+            "created_at": node.get("createdAt"),
+            "updated_at": node.get("updatedAt"),
+            "pushed_at": node.get("pushedAt"),
+        }
+
+    @staticmethod
+    def _history(node):
+        target = (node.get("defaultBranchRef") or {}).get("target") or {}
+        history = target.get("history")
+        if history is None:
+            return {"commits": [], "complete": True}
+        return {
+            "commits": [
+                {
+                    "sha": commit["oid"],
+                    "commit": {
+                        "message": commit.get("message", ""),
+                        "author": {"date": commit.get("authoredDate")},
+                    },
+                }
+                for commit in history.get("nodes", [])
+            ],
+            "complete": not history["pageInfo"]["hasNextPage"],
+        }
+
+    async def fetch(self):
+        """
+        Returns ``(repositories, histories, errors)`` where ``histories`` maps
+        a repository's GitHub id to its recent commits and whether they make
+        up the author's complete history on the default branch.
+        """
+        repositories = []
+        histories = {}
+        errors = []
+
+        viewer, error = await self.client.graphql(VIEWER_QUERY)
+        if error:
+            return repositories, histories, [error]
+
+        cursor = None
+        while True:
+            data, error = await self.client.graphql(
+                REPOSITORIES_QUERY,
+                {
+                    "cursor": cursor,
+                    "pageSize": settings.GITHUB_GRAPHQL_REPOS_PER_PAGE,
+                    "commitCount": settings.GITHUB_GRAPHQL_COMMITS_PER_REPO,
+                    "authorId": viewer["viewer"]["id"],
+                },
+            )
+            if error:
+                errors.append(error)
+                break
+
+            connection = data["viewer"]["repositories"]
+            for node in connection["nodes"]:
+                if not node:
+                    continue
+                repositories.append(self._repo_record(node))
+                histories[node["databaseId"]] = self._history(node)
+
+            if not connection["pageInfo"]["hasNextPage"]:
+                break
+            cursor = connection["pageInfo"]["endCursor"]
+
+        return repositories, histories, errors
 
 
 class GithubSyncService:
-    def __init__(self, user_id, token):
+    def __init__(self, user_id, token, http_client=None):
         self.user_id = user_id
-        self.client = GithubAPIClient(token)
+        self.client = GithubAPIClient(token, http_client=http_client)
         self.profile = None
 
+    def _set_profile(self, profile):
+        self.profile = profile
+        # Validators are keyed per profile as well as per token.
+        self.client.profile_id = profile.pk if profile else None
+
+    @classmethod
+    async def for_user(cls, user_id, token=None, http_client=None):
+        """
+        Build a service for a user, reading the token from their profile when
+        none is given. Queued tasks use this so tokens never sit in the queue.
+        """
+        profile = await GithubProfile.objects.filter(user_id=user_id).afirst()
+        if token is None and profile:
+            token = profile.access_token
+        service = cls(user_id, token, http_client=http_client)
+        service._set_profile(profile)
+        return service
+
     async def _load_profile(self):
         if not self.profile:
-            self.profile = await GithubProfile.objects.filter(
-                user_id=self.user_id
-            ).afirst()
+            self._set_profile(
+                await GithubProfile.objects.filter(user_id=self.user_id).afirst()
+            )
         return self.profile
 
-    def _save_repo_data(self, repo_data):
-        repo_defaults = {
+    @staticmethod
+    def _repo_defaults(repo_data):
+        return {
             "name": repo_data.get("name"),
             "full_name": repo_data.get("full_name"),
             "description": repo_data.get("description"),
@@ -83,6 +730,7 @@ class GithubSyncService:
             "watchers_count": repo_data.get("watchers_count", 0),
             "open_issues_count": repo_data.get("open_issues_count", 0),
             "language": repo_data.get("language"),
+            "topics": repo_data.get("topics") or [],
             "is_private": repo_data.get("private", False),
             "is_fork": repo_data.get("fork", False),
             "is_archived": repo_data.get("archived", False),
@@ -97,130 +745,666 @@ class GithubSyncService:
             else None,
         }
 
-        Repository.objects.update_or_create(
-            github_profile=self.profile,
-            github_id=repo_data.get("id"),
-            defaults=repo_defaults,
-        )
-
-    def _save_commit_data(self, commit_data, repo):
+    @staticmethod
+    def _commit_defaults(commit_data):
         commit_info = commit_data.get("commit", {})
         author_info = commit_info.get("author", {})
 
-        commit_defaults = {
+        return {
             "message": commit_info.get("message", "")[:1000],
-            "date": parse_datetime(author_info.get("date"))
+            "date": parse_datetime(author_info.get("date")),
         }
 
+    def _build_repo(self, repo_data):
+        return Repository(github_profile=self.profile, **self._repo_defaults(repo_data))
+
+    def _build_commit(self, commit_data, repo):
+        return Commit(
+            repository=repo,
+            github_profile=self.profile,
+            sha=commit_data["sha"],
+            **self._commit_defaults(commit_data),
+        )
+
+    def _save_repo_data(self, repo_data):
+        Repository.objects.update_or_create(
+            github_profile=self.profile,
+            github_id=repo_data.get("id"),
+            defaults=self._repo_defaults(repo_data),
+        )
+
+    def _save_commit_data(self, commit_data, repo):
         Commit.objects.update_or_create(
             repository=repo,
             sha=commit_data["sha"],
-            defaults={"github_profile": self.profile, **commit_defaults},
+            defaults={
+                "github_profile": self.profile,
+                **self._commit_defaults(commit_data),
+            },
+        )
+
+    def _upsert_repos(self, items):
+        return self._bulk_upsert(
+            items,
+            REPOSITORY_UPSERT,
+            self._build_repo,
+            self._save_repo_data,
         )
 
-    async def _save_to_db(self, items, save_func):
-        def wrapper():
-            count = 0
-            item_errors = []
-            with transaction.atomic():
-                for item in items:
+    def _upsert_commits(self, items, repo):
+        return self._bulk_upsert(
+            items,
+            COMMIT_UPSERT,
+            lambda d: self._build_commit(d, repo),
+            lambda d: self._save_commit_data(d, repo),
+            lock_func=lambda: self._lock_repository(repo),
+        )
+
+    @staticmethod
+    def _lock_repository(repo):
+        # Syncs and webhook pushes both write a repository's commits, and
+        # webhooks do not take the sync lease. Holding the repository row
+        # makes them classify and count new commits one after the other.
+        list(
+            Repository.objects.select_for_update()
+            .filter(pk=repo.pk)
+            .values_list("pk", flat=True)
+        )
+
+    @staticmethod
+    def _classify_rows(model, key_attnames, compare_attnames, objs):
+        """
+        Map each key of ``objs`` to "inserted", "updated" or "unchanged" by
+        reading the stored rows of the chunk in one query.
+        """
+        lookup = {
+            f"{attname}__in": {key[i] for key in objs}
+            for i, attname in enumerate(key_attnames)
+        }
+        stored = {
+            tuple(row[attname] for attname in key_attnames): row
+            for row in model.objects.filter(**lookup).values(
+                *key_attnames, *compare_attnames
+            )
+        }
+
+        outcomes = {}
+        for key, (_, obj) in objs.items():
+            row = stored.get(key)
+            if row is None:
+                outcomes[key] = "inserted"
+            elif all(getattr(obj, a) == row[a] for a in compare_attnames):
+                outcomes[key] = "unchanged"
+            else:
+                outcomes[key] = "updated"
+        return outcomes
+
+    def _bulk_upsert(self, items, spec, build_func, save_func, lock_func=None):
+        """
+        Upsert ``items`` in chunks of GITHUB_SYNC_BATCH_SIZE with one
+        INSERT .. ON CONFLICT DO UPDATE per chunk. A chunk that fails is
+        retried row by row, each row in its own savepoint, so only the
+        offending items are reported and the rest of the chunk still lands.
+
+        The spec's optional ``on_insert`` hook sees the rows that were new.
+        Rows are told apart by reading them before the write, which is only
+        exact if no other writer inserts them in between: ``lock_func`` runs
+        first in every write transaction to take a lock that serializes
+        such writers.
+        """
+        model = spec["model"]
+        on_insert = spec.get("on_insert")
+        key_attnames = [
+            model._meta.get_field(field).attname for field in spec["unique_fields"]
+        ]
+        # auto_now fields change on every write and say nothing about the data.
+        compare_attnames = [
+            field.attname
+            for field in map(model._meta.get_field, spec["update_fields"])
+            if not getattr(field, "auto_now", False)
+        ]
+        batch_size = settings.GITHUB_SYNC_BATCH_SIZE
+        metrics = get_metrics()
+
+        count = 0
+        item_errors = []
+        for start in range(0, len(items), batch_size):
+            # Keyed by the conflict target: a listing can repeat an item
+            # (e.g. when pages shift while paginating) and a single upsert
+            # statement may not touch the same row twice.
+            objs = {}
+            for item in items[start : start + batch_size]:
+                try:
+                    obj = build_func(item)
+                except Exception as e:
+                    item_errors.append({"item": str(item), "error": str(e)})
+                    continue
+                key = tuple(getattr(obj, attname) for attname in key_attnames)
+                objs[key] = (item, obj)
+
+            if not objs:
+                continue
+
+            try:
+                with transaction.atomic():
+                    if lock_func:
+                        lock_func()
+                    outcomes = self._classify_rows(
+                        model, key_attnames, compare_attnames, objs
+                    )
+                    model.objects.bulk_create(
+                        [obj for _, obj in objs.values()],
+                        update_conflicts=True,
+                        unique_fields=spec["unique_fields"],
+                        update_fields=spec["update_fields"],
+                    )
+                    if on_insert:
+                        on_insert(
+                            [
+                                obj
+                                for key, (_, obj) in objs.items()
+                                if outcomes[key] == "inserted"
+                            ]
+                        )
+                count += len(objs)
+                for outcome in outcomes.values():
+                    metrics.add(f"rows_{outcome}")
+            except Exception:
+                for key, (item, obj) in objs.items():
                     try:
-                        save_func(item)
+                        with transaction.atomic():
+                            if lock_func:
+                                lock_func()
+                            outcome = self._classify_rows(
+                                model,
+                                key_attnames,
+                                compare_attnames,
+                                {key: (item, obj)},
+                            )[key]
+                            save_func(item)
+                            if on_insert and outcome == "inserted":
+                                on_insert([obj])
                         count += 1
+                        metrics.add(f"rows_{outcome}")
                     except Exception as e:
                         item_errors.append({"item": str(item), "error": str(e)})
-            return count, item_errors
 
-        return await sync_to_async(wrapper)()
+        return count, item_errors
+
+    async def _save_to_db(self, items, upsert_func):
+        with get_metrics().timer("db_time"):
+            return await sync_to_async(upsert_func)(items)
+
+    async def _stream_to_db(self, pages, upsert_func, page_filter=None):
+        """
+        Persist a listing page by page while the following pages download.
+        Pages are handed over through a queue of GITHUB_SYNC_PIPELINE_DEPTH
+        pages, so fetching pauses when the database falls behind and memory
+        stays bounded by the page size rather than the listing size.
+
+        ``page_filter`` is an optional coroutine taking a page and returning
+        ``(items_to_keep, stop)``; the listing is abandoned once it asks to
+        stop.
+        """
+        queue = asyncio.Queue(maxsize=settings.GITHUB_SYNC_PIPELINE_DEPTH)
+
+        async def produce():
+            try:
+                # Closed here when the producer is cancelled, so page fetches
+                # still in flight are cancelled now rather than whenever the
+                # generator is garbage collected.
+                async with contextlib.aclosing(aiter(pages)) as stream:
+                    async for page in stream:
+                        await queue.put(page)
+            except Exception as e:
+                pages.errors.append({"error": str(e)})
+            await queue.put(None)
+
+        producer = asyncio.create_task(produce())
+
+        count = 0
+        db_errors = []
+        try:
+            while (page := await queue.get()) is not None:
+                stop = False
+                if page_filter:
+                    page, stop = await page_filter(page)
+
+                page_count, page_errors = await self._save_to_db(page, upsert_func)
+                count += page_count
+                db_errors.extend(page_errors)
+                # Settled for every page so validators stay aligned with
+                # their pages; only a clean save, whose upsert has committed,
+                # stores them.
+                await pages.mark_persisted(store=not page_errors)
+
+                if stop:
+                    break
+        finally:
+            producer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await producer
+
+        return count, pages.errors + db_errors
 
     async def _run_sync_with_log(self, sync_type, sync_coroutine):
+        """
+        Run a sync and record it as one GitHubSyncLog row, inserted once the
+        run has finished. Multi-repository runs log a single row with the
+        outcome of each repository in ``repo_outcomes``.
+        """
         profile = await self._load_profile()
         if not profile:
+            sync_coroutine.close()
             return 0, [{"error": "Profile not found"}]
 
-        log = await GitHubSyncLog.objects.acreate(
-            github_profile=profile,
-            sync_type=sync_type,
-            status="pending",
-        )
-
-        start_time = timezone.now()
+        started_at = timezone.now()
+        status = "failed"
         items_synced = 0
         all_errors = []
 
-        try:
-            items_synced, all_errors = sync_coroutine
-
-            if all_errors and items_synced == 0:
-                log.status = "failed"
-            elif all_errors:
-                log.status = "partial"
-            else:
-                log.status = "success"
-
-        except Exception as e:
-            all_errors.append({"error": f"Critical System Error: {str(e)}"})
-            log.status = "failed"
+        with collect_metrics() as metrics:
+            try:
+                items_synced, all_errors = await sync_coroutine
 
-        finally:
-            completed_at = timezone.now()
-            log.completed_at = completed_at
-            log.duration = completed_at - start_time
+                if all_errors and items_synced == 0:
+                    status = "failed"
+                elif all_errors:
+                    status = "partial"
+                else:
+                    status = "success"
 
-            if sync_type == "repositories":
-                log.repos_synced = items_synced
-            else:
-                log.commits_synced = items_synced
+            except Exception as e:
+                all_errors.append({"error": f"Critical System Error: {str(e)}"})
+                status = "failed"
 
-            log.errors = all_errors[:50]
-            await log.asave()
+            finally:
+                if self.client.token_valid is not None:
+                    await sync_to_async(record_token_check)(
+                        profile, self.client.token_valid
+                    )
+                completed_at = timezone.now()
+                rate_limit = self.client.governor.snapshot()
+                await GitHubSyncLog.objects.acreate(
+                    github_profile=profile,
+                    sync_type=sync_type,
+                    status=status,
+                    repos_synced=items_synced if sync_type == "repositories" else 0,
+                    commits_synced=items_synced if sync_type == "commits" else 0,
+                    errors=all_errors[:50],
+                    rate_limit_remaining=rate_limit["remaining"],
+                    rate_limit_reset_at=rate_limit["reset_at"],
+                    metrics=metrics.as_dict(),
+                    repo_outcomes=metrics.repo_outcomes,
+                    started_at=started_at,
+                    completed_at=completed_at,
+                    duration=completed_at - started_at,
+                )
+                await sync_finished.asend(
+                    sender=type(self),
+                    user_id=self.user_id,
+                    sync_type=sync_type,
+                    status=status,
+                )
 
         return items_synced, all_errors
 
-    async def sync_repositories(self):
+    async def sync_repositories(self, full=False):
+        """
+        Sync the user's repositories. Pages unchanged since the last sync are
+        skipped unless ``full`` is set.
+        """
+
         async def work():
             url = f"{self.client.base_url}/user/repos"
-            data, errors = await self.client.fetch_all(url, {"per_page": 100})
-            count, db_errors = await self._save_to_db(data, self._save_repo_data)
-            errors.extend(db_errors)
-            return count, errors
+            pages = self.client.paginate(
+                url, {"per_page": 100}, conditional=not full, parallel=True
+            )
+            return await self._stream_to_db(pages, self._upsert_repos)
+
+        return await self._run_sync_with_log("repositories", work())
+
+    async def _incremental_since(self, repo):
+        """
+        Date of the newest stored commit, if the repository's last commit sync
+        completed cleanly. Otherwise older pages may be missing and a full
+        listing is needed.
+        """
+        if not repo.commits_synced_at:
+            return None
+        result = await Commit.objects.filter(repository=repo).aaggregate(
+            newest=Max("date")
+        )
+        return result["newest"]
+
+    def _known_sha_filter(self, repo):
+        async def page_filter(page):
+            shas = [item["sha"] for item in page if item.get("sha")]
+            known = {
+                sha
+                async for sha in Commit.objects.filter(
+                    repository=repo, sha__in=shas
+                ).values_list("sha", flat=True)
+            }
+            new_items = [item for item in page if item.get("sha") not in known]
+            return new_items, bool(known)
+
+        return page_filter
+
+    async def _mark_commits_synced(self, repo):
+        repo.commits_synced_at = timezone.now()
+        repo.commits_synced_pushed_at = repo.pushed_at_github
+        await Repository.objects.filter(pk=repo.pk).aupdate(
+            commits_synced_at=repo.commits_synced_at,
+            commits_synced_pushed_at=repo.commits_synced_pushed_at,
+        )
 
-        return await self._run_sync_with_log("repositories", await work())
+    async def sync_commits(self, repo, full=False):
+        """
+        Sync commits of one repository. By default only commits newer than the
+        newest stored one are requested, and pagination stops at the first page
+        containing an already stored SHA. ``full`` re-fetches the whole history.
+        """
 
-    async def sync_commits(self, repo):
         async def work():
-            url = f"{self.client.base_url}/repos/{repo.full_name}/commits"
-            params = {"author": self.profile.github_username, "per_page": 100}
-            data, errors = await self.client.fetch_all(url, params)
-            count, db_errors = await self._save_to_db(
-                data, lambda d: self._save_commit_data(d, repo)
-            )
-            errors.extend(db_errors)
+            count, errors = await self._sync_repo_commits(repo, full=full)
+            get_metrics().record_repo(repo.full_name, count, errors)
             return count, errors
 
-        return await self._run_sync_with_log("commits", await work())
+        return await self._run_sync_with_log("commits", work())
 
-    async def sync_all(self):
-        repos_synced, repo_errors = await self.sync_repositories()
+    async def _sync_repo_commits(self, repo, full=False):
+        url = f"{self.client.base_url}/repos/{repo.full_name}/commits"
+        params = {"author": self.profile.github_username, "per_page": 100}
 
-        if repos_synced == 0:
-            return {"repositories": {"synced": 0, "errors": repo_errors}}
+        since = None if full else await self._incremental_since(repo)
+        page_filter = None
+        if since:
+            params["since"] = since.isoformat()
+            page_filter = self._known_sha_filter(repo)
 
-        repos = await sync_to_async(list)(
-            Repository.objects.filter(github_profile=self.profile)
+        # An incremental listing usually ends on its first page, so only
+        # full listings are worth fetching ahead.
+        pages = self.client.paginate(
+            url, params, conditional=not full, parallel=page_filter is None
         )
+        count, errors = await self._stream_to_db(
+            pages,
+            lambda items: self._upsert_commits(items, repo),
+            page_filter=page_filter,
+        )
+
+        if not errors:
+            await self._mark_commits_synced(repo)
+        return count, errors
+
+    async def sync_commits_for_repos(self, repos, full=False, skipped=()):
+        """
+        Sync commits for many repositories concurrently, bounded per profile by
+        GITHUB_SYNC_REPO_CONCURRENCY and per worker by
+        GITHUB_SYNC_GLOBAL_CONCURRENCY. The run is logged as one "commits"
+        log, which also lists the ``skipped`` repositories. Errors are tagged
+        with the repository they came from.
+        """
 
+        async def work():
+            self._record_skipped(skipped)
+            return await self._sync_commits_for_repos(repos, full=full)
+
+        return await self._run_sync_with_log("commits", work())
+
+    async def _sync_commits_for_repos(self, repos, full=False):
+        profile_semaphore = asyncio.Semaphore(settings.GITHUB_SYNC_REPO_CONCURRENCY)
+        global_semaphore = _get_global_sync_semaphore()
+
+        async def sync_one(repo):
+            async with profile_semaphore, global_semaphore:
+                try:
+                    return await self._sync_repo_commits(repo, full=full)
+                except Exception as e:
+                    return 0, [{"error": str(e)}]
+
+        results = await asyncio.gather(*(sync_one(repo) for repo in repos))
+
+        metrics = get_metrics()
         total_commits_synced = 0
         all_commit_errors = []
-
-        for repo in repos:
-            commits_synced, commit_errors = await self.sync_commits(repo)
+        for repo, (commits_synced, commit_errors) in zip(repos, results):
+            metrics.record_repo(repo.full_name, commits_synced, commit_errors)
             total_commits_synced += commits_synced
             all_commit_errors.extend(
                 [{"repo": repo.full_name, **err} for err in commit_errors]
             )
 
+        return total_commits_synced, all_commit_errors
+
+    async def _pending_commit_repos(self, full=False):
+        """
+        Repositories of the profile that need a commit sync, and the full
+        names of those skipped. Unless ``full`` is set, repositories whose
+        pushed_at is unchanged since their last successful commit sync are
+        skipped.
+        """
+        repositories = Repository.objects.filter(github_profile=self.profile)
+
+        pending = repositories
+        if not full:
+            pending = repositories.filter(
+                Q(pushed_at_github__isnull=True)
+                | Q(commits_synced_pushed_at__isnull=True)
+                | ~Q(pushed_at_github=F("commits_synced_pushed_at"))
+            )
+
+        repos = await sync_to_async(list)(pending)
+        skipped = []
+        if not full:
+            skipped = [
+                full_name
+                async for full_name in repositories.exclude(
+                    pk__in=[repo.pk for repo in repos]
+                ).values_list("full_name", flat=True)
+            ]
+        if skipped:
+            logger.info(
+                f"Skipping commit sync for {len(skipped)} repositories of "
+                f"{self.profile.github_username} with no new pushes"
+            )
+        return repos, skipped
+
+    @staticmethod
+    def _record_skipped(skipped):
+        # Called inside the logged run so the skips land in repo_outcomes.
+        metrics = get_metrics()
+        for full_name in skipped:
+            metrics.record_skipped_repo(full_name, "no new pushes")
+
+    async def sync_all_commits(self, full=False):
+        """
+        Sync commits of every repository of the profile that has new pushes,
+        or of every repository when ``full`` is set.
+        """
+        profile = await self._load_profile()
+        if not profile:
+            return {
+                "synced": 0,
+                "errors": [{"error": "Profile not found"}],
+                "skipped": 0,
+            }
+
+        repos, skipped = await self._pending_commit_repos(full=full)
+        synced, errors = await self.sync_commits_for_repos(
+            repos, full=full, skipped=skipped
+        )
+        return {"synced": synced, "errors": errors, "skipped": len(skipped)}
+
+    async def _sync_repo_languages(self, repo, full=False):
+        """
+        Fetch one repository's language breakdown, conditionally unless
+        ``full`` is set. Returns ``(changed, errors)``.
+        """
+        url = f"{self.client.base_url}/repos/{repo.full_name}/languages"
+        pages = self.client.paginate(url, conditional=not full)
+        languages = None
+        async for page in pages:
+            languages = page
+        if pages.errors:
+            return False, pages.errors
+
+        if languages is None:
+            # 304 Not Modified: the stored breakdown is still current.
+            await sync_to_async(mark_languages_synced)(repo)
+            return False, []
+        changed = await sync_to_async(store_repository_languages)(repo, languages)
+        await pages.mark_persisted()
+        return changed, []
+
+    async def sync_languages(self, full=False):
+        """
+        Refresh the language breakdown of repositories pushed to since their
+        breakdown was last fetched (every repository when ``full`` is set),
+        concurrently under the same limits as the commit sync. Profile totals
+        are updated with each repository's change.
+        """
+
+        async def work():
+            repositories = Repository.objects.filter(github_profile=self.profile)
+            if not full:
+                repositories = repositories.filter(
+                    Q(languages_synced_pushed_at__isnull=True)
+                    | Q(pushed_at_github__isnull=True)
+                    | ~Q(pushed_at_github=F("languages_synced_pushed_at"))
+                )
+            repos = await sync_to_async(list)(repositories)
+
+            profile_semaphore = asyncio.Semaphore(settings.GITHUB_SYNC_REPO_CONCURRENCY)
+            global_semaphore = _get_global_sync_semaphore()
+
+            async def sync_one(repo):
+                async with profile_semaphore, global_semaphore:
+                    try:
+                        return await self._sync_repo_languages(repo, full=full)
+                    except Exception as e:
+                        return False, [{"error": str(e)}]
+
+            results = await asyncio.gather(*(sync_one(repo) for repo in repos))
+
+            metrics = get_metrics()
+            changed = 0
+            errors = []
+            for repo, (repo_changed, repo_errors) in zip(repos, results):
+                metrics.record_repo(repo.full_name, repo_changed, repo_errors)
+                changed += repo_changed
+                errors.extend([{"repo": repo.full_name, **err} for err in repo_errors])
+            return changed, errors
+
+        synced, errors = await self._run_sync_with_log("languages", work())
+        return {"synced": synced, "errors": errors}
+
+    async def _history_overlaps(self, repo, history):
+        """
+        Whether a truncated history window reaches back to a commit that is
+        already stored, i.e. nothing between the two is missing.
+        """
+        commits = history["commits"]
+        if not commits or not repo.commits_synced_at:
+            return False
+        return await Commit.objects.filter(
+            repository=repo, sha=commits[-1]["sha"]
+        ).aexists()
+
+    async def _sync_all_graphql(self, full=False):
+        engine = GraphQLSyncEngine(self.client)
+        histories = {}
+
+        async def sync_repos():
+            repositories, fetched_histories, errors = await engine.fetch()
+            histories.update(fetched_histories)
+            count, db_errors = await self._save_to_db(repositories, self._upsert_repos)
+            errors.extend(db_errors)
+            return count, errors
+
+        repos_synced, repo_errors = await self._run_sync_with_log(
+            "repositories", sync_repos()
+        )
+        if repos_synced == 0 and repo_errors:
+            return {"repositories": {"synced": 0, "errors": repo_errors}}
+
+        repos, skipped = await self._pending_commit_repos(full=full)
+
+        async def save_histories():
+            self._record_skipped(skipped)
+            metrics = get_metrics()
+            total = 0
+            errors = []
+            # Repositories whose window does not cover everything new fall
+            # back to the REST commit listing, within the same logged run. A
+            # full sync re-fetches whole histories, so only a complete window
+            # is enough there, however much of it is already stored.
+            incomplete = []
+            for repo in repos:
+                history = histories.get(repo.github_id)
+                if history is None or not (
+                    history["complete"]
+                    or (not full and await self._history_overlaps(repo, history))
+                ):
+                    incomplete.append(repo)
+                    continue
+
+                count, db_errors = await self._save_to_db(
+                    history["commits"],
+                    lambda items, repo=repo: self._upsert_commits(items, repo),
+                )
+                metrics.record_repo(repo.full_name, count, db_errors)
+                total += count
+                errors.extend([{"repo": repo.full_name, **err} for err in db_errors])
+                if not db_errors:
+                    await self._mark_commits_synced(repo)
+
+            if incomplete:
+                rest_synced, rest_errors = await self._sync_commits_for_repos(
+                    incomplete, full=full
+                )
+                total += rest_synced
+                errors.extend(rest_errors)
+            return total, errors
+
+        commits_synced, commit_errors = await self._run_sync_with_log(
+            "commits", save_histories()
+        )
+
+        return {
+            "repositories": {"synced": repos_synced, "errors": repo_errors},
+            "commits": {
+                "synced": commits_synced,
+                "errors": commit_errors,
+                "skipped": len(skipped),
+            },
+            "languages": await self.sync_languages(full=full),
+        }
+
+    async def sync_all(self, full=False):
+        if settings.GITHUB_SYNC_ENGINE == "graphql":
+            result = await self._sync_all_graphql(full=full)
+        else:
+            result = await self._sync_all_rest(full=full)
+
+        if self.profile:
+            self.profile.last_sync = timezone.now()
+            await GithubProfile.objects.filter(pk=self.profile.pk).aupdate(
+                last_sync=self.profile.last_sync
+            )
+        return result
+
+    async def _sync_all_rest(self, full=False):
+        repos_synced, repo_errors = await self.sync_repositories(full=full)
+
+        # Nothing synced is expected when every page came back 304 Not
+        # Modified; only a listing that failed outright stops the run here.
+        if repos_synced == 0 and repo_errors:
+            return {"repositories": {"synced": 0, "errors": repo_errors}}
+
         return {
             "repositories": {"synced": repos_synced, "errors": repo_errors},
-            "commits": {"synced": total_commits_synced, "errors": all_commit_errors},
+            "commits": await self.sync_all_commits(full=full),
+            "languages": await self.sync_languages(full=full),
         }
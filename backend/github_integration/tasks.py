@@ -1,38 +1,88 @@
-from django.tasks import task
 from asgiref.sync import sync_to_async
-from .sync import GithubSyncService
-from .models import Repository
+from django.tasks import task
+from .leases import defer_sync, sync_lease
+from .models import GithubProfile, WebhookDelivery
+from .sync import GithubAPIClient, GithubSyncService
+from .tokens import set_token_validity
+from .webhooks import process_delivery
 
+# Returned by a job that found another sync of the same profile running.
+SKIPPED = {"skipped": "Another sync of this profile is running"}
 
-@task
-async def sync_repositories_task(user_id, token):
-    service = GithubSyncService(user_id, token)
-    result = await service.sync_repositories()
+
+async def _run_sync(context, user_id, token, sync_type, full, run):
+    """
+    Run ``run(service)`` under the profile's lease. A run cut short because
+    the rate limit only frees up after GITHUB_RATE_LIMIT_MAX_WAIT is enqueued
+    again for when it does.
+    """
+    job_id = context.task_result.id
+    async with sync_lease(user_id, job_id, sync_type, full) as acquired:
+        if not acquired:
+            return SKIPPED
+        service = await GithubSyncService.for_user(user_id, token)
+        result = await run(service)
+
+    # Once the lease is released, so the new job is not folded into this one.
+    retry_at = service.client.deferred_until
+    if retry_at:
+        await sync_to_async(defer_sync)(user_id, sync_type, full, retry_at)
     return result
 
 
-@task
-async def sync_commits_task(user_id, token):
-    service = GithubSyncService(user_id, token)
-    await service._load_profile()
-    
-    repos = await sync_to_async(list)(
-        Repository.objects.filter(github_profile=service.profile)
+# Tasks take only the user id; the token is read from the user's profile when
+# the task runs, so it is never written to the task queue.
+@task(takes_context=True)
+async def sync_repositories_task(context, user_id, token=None):
+    return await _run_sync(
+        context,
+        user_id,
+        token,
+        "repositories",
+        False,
+        lambda service: service.sync_repositories(),
+    )
+
+
+@task(takes_context=True)
+async def sync_commits_task(context, user_id, token=None, full=False):
+    return await _run_sync(
+        context,
+        user_id,
+        token,
+        "commits",
+        full,
+        lambda service: service.sync_all_commits(full=full),
+    )
+
+
+@task(takes_context=True)
+async def sync_all_task(context, user_id, token=None, full=False):
+    return await _run_sync(
+        context,
+        user_id,
+        token,
+        "all",
+        full,
+        lambda service: service.sync_all(full=full),
     )
-    
-    total_synced = 0
-    all_errors = []
-    
-    for repo in repos:
-        count, errors = await service.sync_commits(repo)
-        total_synced += count
-        all_errors.extend(errors)
-    
-    return {"synced": total_synced, "errors": all_errors}
 
 
 @task
-async def sync_all_task(user_id, token):
-    service = GithubSyncService(user_id, token)
-    result = await service.sync_all()
-    return result
+def process_webhook_task(delivery_id):
+    delivery = WebhookDelivery.objects.filter(pk=delivery_id).first()
+    if delivery is None or delivery.status in ("processed", "ignored"):
+        return None
+    process_delivery(delivery)
+    return delivery.status
+
+
+@task
+async def validate_token_task(user_id):
+    profile = await GithubProfile.objects.filter(user_id=user_id).afirst()
+    if profile is None or not profile.access_token:
+        return None
+    valid = await GithubAPIClient(profile.access_token).check_token()
+    if valid is not None:
+        await sync_to_async(set_token_validity)(profile, valid)
+    return valid
@@ -1,3 +1,280 @@
-from django.test import TestCase
+import hashlib
+import hmac
+import json
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+import httpx
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from .conditional import validator_key
+from .models import Commit, GithubProfile, Repository, WebhookDelivery
+from .sync import GithubSyncService
+
+SECRET = "webhook-secret"
+
+
+@override_settings(GITHUB_WEBHOOK_SECRET=SECRET)
+@mock.patch("github_integration.views.process_webhook_task")
+class GithubWebhookViewTests(TestCase):
+    def post(self, payload, event="push", delivery_id="delivery-1", secret=SECRET):
+        body = json.dumps(payload).encode()
+        signature = (
+            "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        )
+        return self.client.post(
+            reverse("github-webhook"),
+            data=body,
+            content_type="application/json",
+            headers={
+                "X-Hub-Signature-256": signature,
+                "X-GitHub-Event": event,
+                "X-GitHub-Delivery": delivery_id,
+            },
+        )
+
+    def test_signed_delivery_is_stored_and_queued(self, task):
+        response = self.post({"action": "created", "repository": {"id": 1}})
+
+        self.assertEqual(response.status_code, 202)
+        delivery = WebhookDelivery.objects.get(delivery_id="delivery-1")
+        self.assertEqual(delivery.event, "push")
+        self.assertEqual(delivery.action, "created")
+        task.enqueue.assert_called_once_with(delivery.pk)
+
+    def test_bad_signature_is_rejected(self, task):
+        response = self.post({"repository": {"id": 1}}, secret="wrong-secret")
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(WebhookDelivery.objects.exists())
+        task.enqueue.assert_not_called()
+
+    def test_redelivery_is_applied_once(self, task):
+        self.post({"repository": {"id": 1}})
+        response = self.post({"repository": {"id": 1}})
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(WebhookDelivery.objects.count(), 1)
+        task.enqueue.assert_called_once()
+
+    def test_unknown_event_is_ignored(self, task):
+        response = self.post({"action": "opened"}, event="issues")
+
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(WebhookDelivery.objects.exists())
+        task.enqueue.assert_not_called()
+
+    def test_non_object_payload_is_rejected(self, task):
+        response = self.post(["not", "an", "object"])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(WebhookDelivery.objects.exists())
+        task.enqueue.assert_not_called()
+
+
+def _commit(sha, day):
+    return {
+        "sha": sha,
+        "commit": {"message": sha, "author": {"date": f"2026-01-{day:02d}T00:00:00Z"}},
+    }
+
+
+class GraphQLStandIn:
+    """
+    Canned GitHub API: GraphQL returns one repository whose history window is
+    truncated, and the REST commit listing returns its whole history.
+    """
+
+    def __init__(self, window, history):
+        self.window = window
+        self.history = history
+        self.paths = []
+
+    def repositories(self):
+        node = {
+            "databaseId": 1,
+            "name": "project",
+            "nameWithOwner": "octocat/project",
+            "url": "https://github.com/octocat/project",
+            "pushedAt": "2026-01-10T00:00:00Z",
+            "defaultBranchRef": {
+                "target": {
+                    "history": {
+                        "pageInfo": {"hasNextPage": True},
+                        "nodes": [
+                            {
+                                "oid": item["sha"],
+                                "message": item["commit"]["message"],
+                                "authoredDate": item["commit"]["author"]["date"],
+                            }
+                            for item in self.window
+                        ],
+                    }
+                }
+            },
+        }
+        connection = {
+            "pageInfo": {"hasNextPage": False, "endCursor": None},
+            "nodes": [node],
+        }
+        return {"data": {"viewer": {"repositories": connection}}}
+
+    def __call__(self, request):
+        self.paths.append(request.url.path)
+        if request.url.path == "/graphql":
+            if "repositories(" in json.loads(request.content)["query"]:
+                return httpx.Response(200, json=self.repositories())
+            return httpx.Response(
+                200, json={"data": {"viewer": {"id": "U_1", "login": "octocat"}}}
+            )
+        if request.url.path.endswith("/commits"):
+            return httpx.Response(200, json=self.history)
+        if request.url.path.endswith("/languages"):
+            return httpx.Response(200, json={})
+        return httpx.Response(404, json={"message": "Not Found"})
+
+
+@override_settings(
+    GITHUB_SYNC_ENGINE="graphql",
+    GITHUB_BASE_URL="https://github.test",
+    GITHUB_GRAPHQL_URL="https://github.test/graphql",
+    GITHUB_VALIDATOR_STORE="none",
+)
+class GraphQLFullSyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="octocat")
+        cls.profile = GithubProfile.objects.create(
+            user=cls.user, github_username="octocat", github_id=1
+        )
+        cls.repo = Repository.objects.create(
+            github_profile=cls.profile,
+            name="project",
+            full_name="octocat/project",
+            github_id=1,
+            html_url="https://github.com/octocat/project",
+            clone_url="https://github.com/octocat/project.git",
+            git_url="git://github.com/octocat/project.git",
+            commits_synced_at=datetime(2026, 1, 5, tzinfo=dt_timezone.utc),
+        )
+        # The oldest commit was lost; the window reaches back to a stored one.
+        history = [_commit(f"sha{day}", day) for day in range(5, 0, -1)]
+        for item in history[2:4]:
+            Commit.objects.create(
+                repository=cls.repo,
+                github_profile=cls.profile,
+                sha=item["sha"],
+                message=item["commit"]["message"],
+                date=datetime.fromisoformat(item["commit"]["author"]["date"]),
+            )
+        cls.history = history
+
+    async def sync(self, full):
+        stand_in = GraphQLStandIn(window=self.history[:3], history=self.history)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(stand_in)) as client:
+            service = await GithubSyncService.for_user(
+                self.user.pk, "token", http_client=client
+            )
+            await service.sync_all(full=full)
+        return stand_in
+
+    async def test_full_sync_refetches_truncated_history(self):
+        stand_in = await self.sync(full=True)
+
+        self.assertIn("/repos/octocat/project/commits", stand_in.paths)
+        self.assertTrue(await Commit.objects.filter(sha="sha1").aexists())
+
+    async def test_incremental_sync_trusts_overlapping_window(self):
+        stand_in = await self.sync(full=False)
+
+        self.assertNotIn("/repos/octocat/project/commits", stand_in.paths)
+        self.assertFalse(await Commit.objects.filter(sha="sha1").aexists())
+
+
+class MemoryValidatorStore:
+    def __init__(self):
+        self.records = {}
+
+    async def get(self, key):
+        return self.records.get(key)
+
+    async def set(self, key, record):
+        self.records[key] = record
+
+
+class ListingStandIn:
+    """
+    Paginated listing answering If-None-Match with 304 like GitHub. Each page
+    holds one item and its ETag only depends on that item, so pages added
+    later leave the ETags of the earlier ones unchanged.
+    """
+
+    url = "https://github.test/user/repos"
+
+    def __init__(self, page_count):
+        self.page_count = page_count
+
+    def __call__(self, request):
+        page = int(request.url.params.get("page", "1"))
+        items = [{"id": page}] if page <= self.page_count else []
+        etag = f'"etag-{page if items else "empty"}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304)
+        headers = {"ETag": etag}
+        if page < self.page_count:
+            headers["Link"] = (
+                f'<{self.url}?page={page + 1}>; rel="next", '
+                f'<{self.url}?page={self.page_count}>; rel="last"'
+            )
+        return httpx.Response(200, json=items, headers=headers)
+
+
+@override_settings(GITHUB_BASE_URL="https://github.test")
+class StreamValidatorTests(SimpleTestCase):
+    url = ListingStandIn.url
+
+    async def stream(self, store, stand_in, failing_ids=(), parallel=False):
+        saved = []
+
+        def upsert(items):
+            if any(item["id"] in failing_ids for item in items):
+                return 0, [{"error": "row failed"}]
+            saved.extend(items)
+            return len(items), []
+
+        transport = httpx.MockTransport(stand_in)
+        async with httpx.AsyncClient(transport=transport) as client:
+            service = GithubSyncService(1, "token", http_client=client)
+            service.client.validator_store = store
+            pages = service.client.paginate(
+                self.url, {"per_page": 100}, parallel=parallel
+            )
+            await service._stream_to_db(pages, upsert)
+        return saved
+
+    async def test_failed_page_does_not_take_next_page_validators(self):
+        store = MemoryValidatorStore()
+        stand_in = ListingStandIn(page_count=2)
+
+        await self.stream(store, stand_in, failing_ids={1})
+
+        first = validator_key(self.url, {"per_page": 100}, "token")
+        second = validator_key(f"{self.url}?page=2", None, "token")
+        self.assertNotIn(first, store.records)
+        self.assertEqual(store.records[second]["etag"], '"etag-2"')
+
+        # The failed page is fetched in full again; the saved one is a 304.
+        saved = await self.stream(store, stand_in)
+        self.assertEqual(saved, [{"id": 1}])
+
+    async def test_listing_grown_behind_unchanged_pages_is_followed(self):
+        store = MemoryValidatorStore()
+        stand_in = ListingStandIn(page_count=2)
+        await self.stream(store, stand_in, parallel=True)
+
+        stand_in.page_count = 3
+        saved = await self.stream(store, stand_in, parallel=True)
+
+        self.assertEqual(saved, [{"id": 3}])
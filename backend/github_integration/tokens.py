@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import GithubProfile
+
+
+def token_cache_key(user_id):
+    return f"github_token_valid:{user_id}"
+
+
+def has_valid_token(user_id):
+    """
+    Whether the user has a GitHub token that was valid when last checked.
+    Answered from the cache, falling back to one indexed profile query; GitHub
+    itself is never called here; tokens are checked in the background.
+    """
+    key = token_cache_key(user_id)
+    valid = cache.get(key)
+    if valid is None:
+        valid = (
+            GithubProfile.objects.filter(user_id=user_id, token_valid=True)
+            .exclude(access_token__isnull=True)
+            .exists()
+        )
+        cache.set(key, valid)
+    return valid
+
+
+def set_token_validity(profile, valid):
+    """Store the outcome of a token check on the profile and in the cache."""
+    profile.token_valid = valid
+    profile.token_checked_at = timezone.now()
+    GithubProfile.objects.filter(pk=profile.pk).update(
+        token_valid=profile.token_valid, token_checked_at=profile.token_checked_at
+    )
+    cache.set(token_cache_key(profile.user_id), valid)
+
+
+def record_token_check(profile, valid):
+    """
+    Record what a sync learnt about the token. The write is skipped when it
+    confirms a state checked within the last GITHUB_TOKEN_CHECK_INTERVAL, so
+    routine syncs do not touch the profile.
+    """
+    interval = timedelta(seconds=settings.GITHUB_TOKEN_CHECK_INTERVAL)
+    if (
+        profile.token_valid == valid
+        and profile.token_checked_at
+        and timezone.now() - profile.token_checked_at < interval
+    ):
+        return
+    set_token_validity(profile, valid)
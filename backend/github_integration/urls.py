@@ -1,8 +1,11 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from .views import GithubSyncView
+from .views import GithubSyncView, GithubWebhookView
 
 router = DefaultRouter()
 router.register(r"", GithubSyncView, basename="github-integration")
 
-urlpatterns = router.urls
\ No newline at end of file
+urlpatterns = [
+    path("webhook/", GithubWebhookView.as_view(), name="github-webhook"),
+] + router.urls
\ No newline at end of file
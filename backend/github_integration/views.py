@@ -1,20 +1,45 @@
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
 from drf_spectacular.utils import extend_schema
 
-from .serializers import SyncNowResponseSerializer
-from .models import GithubProfile
-from .tasks import (
-    sync_repositories_task,
-    sync_commits_task,
-    sync_all_task,
+from .serializers import (
+    ContributionCalendarSerializer,
+    ContributionRequestSerializer,
+    SyncNowResponseSerializer,
+    SyncRequestSerializer,
+    WebhookAckSerializer,
 )
+from .contributions import daily_contributions
+from .models import GithubProfile, WebhookDelivery
+from .leases import start_sync
+from .tasks import process_webhook_task
+from .webhooks import SUPPORTED_EVENTS, verify_signature
 
 
 # Create your views here.
 @extend_schema(tags=["GitHub Integration"])
 class GithubSyncView(GenericViewSet):
+    def _start_sync(self, request, sync_type, message, full=False):
+        github_username = request.user.github_username
+        profile = GithubProfile.objects.filter(github_username=github_username).first()
+        if not profile or not profile.access_token:
+            return Response({"error": "Token not found"}, status=400)
+
+        job = start_sync(profile, sync_type, full=full)
+        if job["deduplicated"]:
+            message = "Sync already in progress"
+        serializer = SyncNowResponseSerializer({"message": message, **job})
+        return Response(serializer.data)
+
     @extend_schema(
         summary="Sync Repositories Now",
         description="Triggers synchronization of GitHub repositories for the authenticated user.",
@@ -23,57 +48,122 @@ class GithubSyncView(GenericViewSet):
     )
     @action(detail=False, methods=["post"], url_path="sync-repo")
     def sync_repo(self, request):
-        github_username = request.user.github_username
-        token = (
-            GithubProfile.objects.filter(github_username=github_username)
-            .first()
-            .access_token
-        )
-        if not token:
-            return Response({"error": "Token not found"}, status=400)
-
-        sync_repositories_task.enqueue(request.user.id, token)
-        serializer = SyncNowResponseSerializer({"message": "Sync started"})
-        return Response(serializer.data)
+        return self._start_sync(request, "repositories", "Sync started")
 
     @extend_schema(
         summary="Sync Commits Now",
         description="Triggers synchronization of GitHub commits for the authenticated user.",
         request=None,
+        parameters=[SyncRequestSerializer],
         responses={200: SyncNowResponseSerializer},
     )
     @action(detail=False, methods=["post"], url_path="sync-commits")
     def sync_commits(self, request):
-        github_username = request.user.github_username
-        token = (
-            GithubProfile.objects.filter(github_username=github_username)
-            .first()
-            .access_token
+        params = SyncRequestSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return self._start_sync(
+            request,
+            "commits",
+            "Commit sync started",
+            full=params.validated_data["full"],
         )
-        if not token:
-            return Response({"error": "Token not found"}, status=400)
-
-        sync_commits_task.enqueue(request.user.id, token)
-        serializer = SyncNowResponseSerializer({"message": "Commit sync started"})
-        return Response(serializer.data)
 
     @extend_schema(
         summary="Sync All GitHub Data Now",
         description="Triggers synchronization of all GitHub data for the authenticated user.",
         request=None,
+        parameters=[SyncRequestSerializer],
         responses={200: SyncNowResponseSerializer},
     )
     @action(detail=False, methods=["post"], url_path="sync-all")
     def sync_all(self, request):
-        github_username = request.user.github_username
-        token = (
-            GithubProfile.objects.filter(github_username=github_username)
-            .first()
-            .access_token
+        params = SyncRequestSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return self._start_sync(
+            request, "all", "Full sync started", full=params.validated_data["full"]
         )
-        if not token:
-            return Response({"error": "Token not found"}, status=400)
 
-        sync_all_task.enqueue(request.user.id, token)
-        serializer = SyncNowResponseSerializer({"message": "Full sync started"})
+    @extend_schema(
+        summary="Daily Contributions",
+        description="Commits per day of the authenticated user's GitHub profile, read from the daily rollup.",
+        parameters=[ContributionRequestSerializer],
+        responses={200: ContributionCalendarSerializer},
+    )
+    @action(detail=False, methods=["get"], url_path="contributions")
+    def contributions(self, request):
+        params = ContributionRequestSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        end = timezone.now().date()
+        start = end - timedelta(days=params.validated_data["days"] - 1)
+        days = daily_contributions(request.user.id, start, end)
+        serializer = ContributionCalendarSerializer(
+            {
+                "start": start,
+                "end": end,
+                "total": sum(day["count"] for day in days),
+                "days": days,
+            }
+        )
         return Response(serializer.data)
+
+
+@extend_schema(tags=["GitHub Integration"])
+class GithubWebhookView(APIView):
+    # GitHub authenticates with the payload signature, not a user session.
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    throttle_classes = []
+
+    @extend_schema(
+        summary="GitHub Webhook",
+        description="Receives signed GitHub webhook deliveries (push, repository, "
+        "star, create, delete). Deliveries are stored and applied in the "
+        "background without calling the GitHub API.",
+        request=None,
+        responses={202: WebhookAckSerializer},
+    )
+    def post(self, request):
+        signature = request.headers.get("X-Hub-Signature-256")
+        if not verify_signature(
+            settings.GITHUB_WEBHOOK_SECRET, request.body, signature
+        ):
+            return Response(
+                {"error": "Invalid signature"}, status=status.HTTP_403_FORBIDDEN
+            )
+
+        event = request.headers.get("X-GitHub-Event", "")
+        if event == "ping":
+            return Response(WebhookAckSerializer({"message": "pong"}).data)
+        if event not in SUPPORTED_EVENTS:
+            serializer = WebhookAckSerializer({"message": f"Event '{event}' ignored"})
+            return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+        delivery_id = request.headers.get("X-GitHub-Delivery")
+        if not delivery_id:
+            return Response(
+                {"error": "Missing delivery id"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            payload = json.loads(request.body)
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            return Response(
+                {"error": "Payload must be a JSON object"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # GitHub redelivers with the same id; each delivery is applied once.
+        delivery, created = WebhookDelivery.objects.get_or_create(
+            delivery_id=delivery_id,
+            defaults={
+                "event": event,
+                "action": payload.get("action"),
+                "payload": payload,
+            },
+        )
+        if created:
+            process_webhook_task.enqueue(delivery.pk)
+
+        serializer = WebhookAckSerializer({"message": "Delivery accepted"})
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
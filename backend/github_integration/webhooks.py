@@ -0,0 +1,211 @@
+import hashlib
+import hmac
+import logging
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .languages import remove_repository_languages
+from .models import GithubProfile, Repository
+from .signals import webhook_applied
+from .sync import GithubSyncService
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EVENTS = {"push", "repository", "star", "create", "delete"}
+
+# GitHub lists at most this many commits in a push payload.
+MAX_PUSH_COMMITS = 2048
+
+COUNTER_FIELDS = {
+    "stars_count": "stargazers_count",
+    "forks_count": "forks_count",
+    "watchers_count": "watchers_count",
+    "open_issues_count": "open_issues_count",
+}
+
+
+def verify_signature(secret, body, signature):
+    """Check an X-Hub-Signature-256 header against the raw request body."""
+    if not secret or not signature:
+        return False
+    expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def _timestamp(value):
+    # Push payloads give repository dates as Unix timestamps, other events as
+    # ISO 8601 strings.
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=dt_timezone.utc)
+    return parse_datetime(value)
+
+
+def _service(profile):
+    # Webhooks are applied from their payload alone, so no token is needed.
+    service = GithubSyncService(profile.user_id, None)
+    service.profile = profile
+    return service
+
+
+def _update_counters(repo_payload):
+    values = {
+        field: repo_payload[key]
+        for field, key in COUNTER_FIELDS.items()
+        if key in repo_payload
+    }
+    if not values:
+        return 0
+    return Repository.objects.filter(github_id=repo_payload["id"]).update(**values)
+
+
+def _commit_record(commit):
+    """Shape a push payload commit like an item of the REST commit listing."""
+    return {
+        "sha": commit["id"],
+        "commit": {
+            "message": commit.get("message", ""),
+            "author": {"date": commit.get("timestamp")},
+        },
+    }
+
+
+def handle_push(payload):
+    """
+    Store the pushed commits of each tracked copy of the repository that are
+    authored by the copy's profile. Only default-branch pushes are applied,
+    matching what the commit sync lists.
+
+    When the repository's commits were up to date before the push and the
+    payload lists every pushed commit, the repository is marked synced at the
+    new pushed_at so the next scheduled sync skips it.
+    """
+    repo_payload = payload["repository"]
+    if payload.get("ref") != f"refs/heads/{repo_payload.get('default_branch')}":
+        return 0
+
+    pushed_at = _timestamp(repo_payload.get("pushed_at"))
+    commits = payload.get("commits") or []
+    complete = not payload.get("forced") and len(commits) < MAX_PUSH_COMMITS
+
+    applied = 0
+    repos = Repository.objects.filter(github_id=repo_payload["id"]).select_related(
+        "github_profile"
+    )
+    for repo in repos:
+        profile = repo.github_profile
+        username = profile.github_username.lower()
+        items = [
+            _commit_record(commit)
+            for commit in commits
+            if ((commit.get("author") or {}).get("username") or "").lower() == username
+        ]
+
+        errors = []
+        if items:
+            count, errors = _service(profile)._upsert_commits(items, repo)
+            applied += count
+        for error in errors:
+            logger.warning(
+                f"Failed to store pushed commit for {repo.full_name}: {error}"
+            )
+
+        was_current = (
+            repo.commits_synced_at is not None
+            and repo.commits_synced_pushed_at == repo.pushed_at_github
+        )
+        if pushed_at is None:
+            continue
+        updates = {"pushed_at_github": pushed_at}
+        if was_current and complete and not errors:
+            updates["commits_synced_at"] = timezone.now()
+            updates["commits_synced_pushed_at"] = pushed_at
+        Repository.objects.filter(pk=repo.pk).update(**updates)
+
+    return applied
+
+
+def handle_repository(payload):
+    """
+    Apply a repository event: delete tracked copies of a deleted repository,
+    otherwise upsert it for its owner and every profile already tracking it.
+    """
+    repo_payload = payload["repository"]
+    if payload.get("action") == "deleted":
+        repositories = Repository.objects.filter(github_id=repo_payload["id"])
+        with transaction.atomic():
+            remove_repository_languages(repositories)
+            deleted, _ = repositories.delete()
+        return deleted
+
+    owner_id = (repo_payload.get("owner") or {}).get("id")
+    profiles = GithubProfile.objects.filter(
+        Q(repositories__github_id=repo_payload["id"]) | Q(github_id=owner_id)
+    ).distinct()
+
+    applied = 0
+    for profile in profiles:
+        count, errors = _service(profile)._upsert_repos([repo_payload])
+        applied += count
+        for error in errors:
+            logger.warning(f"Failed to store repository from webhook: {error}")
+    return applied
+
+
+def handle_counters(payload):
+    """Refresh stars, forks, watchers and open issues from the payload."""
+    return _update_counters(payload["repository"])
+
+
+HANDLERS = {
+    "push": handle_push,
+    "repository": handle_repository,
+    "star": handle_counters,
+    "create": handle_counters,
+    "delete": handle_counters,
+}
+
+
+def _affected_user_ids(repo_payload):
+    owner_id = (repo_payload.get("owner") or {}).get("id")
+    return set(
+        GithubProfile.objects.filter(
+            Q(repositories__github_id=repo_payload.get("id")) | Q(github_id=owner_id)
+        ).values_list("user_id", flat=True)
+    )
+
+
+def process_delivery(delivery):
+    """
+    Apply a stored delivery and record the outcome on it. Failures are
+    recorded and re-raised so the task is retried.
+    """
+    handler = HANDLERS.get(delivery.event)
+    try:
+        if handler is None or "repository" not in delivery.payload:
+            delivery.status = "ignored"
+        else:
+            # Read before the handler runs, as a deleted repository takes its
+            # link to the profiles with it.
+            user_ids = _affected_user_ids(delivery.payload["repository"])
+            handler(delivery.payload)
+            delivery.status = "processed"
+            if user_ids:
+                webhook_applied.send(
+                    sender=delivery.__class__,
+                    user_ids=user_ids,
+                    event=delivery.event,
+                )
+        delivery.error = None
+    except Exception as e:
+        delivery.status = "failed"
+        delivery.error = str(e)
+        raise
+    finally:
+        delivery.processed_at = timezone.now()
+        delivery.save(update_fields=["status", "error", "processed_at"])
@@ -1,6 +1,12 @@
 from django.contrib import admin
 
-from .models import PortfolioSection, PortfolioSettings, Skill, SocialLinks
+from .models import (
+    PortfolioSection,
+    PortfolioSettings,
+    PortfolioSnapshot,
+    Skill,
+    SocialLinks,
+)
 
 
 # Register your models here.
@@ -35,7 +41,14 @@ class SkillAdmin(admin.ModelAdmin):
     list_filter = ("proficiency", "created_at")
 
 
+class PortfolioSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("user", "version", "built_at")
+    search_fields = ("user__email",)
+    exclude = ("document",)
+
+
 admin.site.register(PortfolioSettings, PortfolioSettingsAdmin)
 admin.site.register(SocialLinks, SocialLinksAdmin)
 admin.site.register(PortfolioSection, PortfolioSectionAdmin)
 admin.site.register(Skill, SkillAdmin)
+admin.site.register(PortfolioSnapshot, PortfolioSnapshotAdmin)
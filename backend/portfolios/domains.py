@@ -0,0 +1,87 @@
+import logging
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import PortfolioSettings
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = "custom_domains:version"
+
+
+def normalize_domain(value):
+    """Host name of a stored custom domain, which may include a scheme or port."""
+    if not value:
+        return None
+    if "//" not in value:
+        value = f"//{value}"
+    try:
+        return urlsplit(value).hostname
+    except ValueError:
+        return None
+
+
+def bump_domain_version():
+    """Tell every process to reload its domain map."""
+    cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+class DomainMap:
+    """
+    Per-process map of custom domain to portfolio slug. Loaded with one query
+    on first use and reloaded when the shared version stamp changes. The
+    stamp is read from the cache at most every CUSTOM_DOMAIN_CHECK_INTERVAL
+    seconds, so resolving a host normally costs a dict lookup.
+    """
+
+    def __init__(self):
+        self._domains = None
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self, version):
+        max_entries = settings.CUSTOM_DOMAIN_MAX_ENTRIES
+        rows = (
+            PortfolioSettings.objects.filter(
+                is_published=True, custom_domain__isnull=False
+            )
+            .exclude(custom_domain="")
+            .values_list("custom_domain", "slug")
+        )
+        domains = {}
+        for custom_domain, slug in rows.iterator():
+            host = normalize_domain(custom_domain)
+            if host:
+                domains[host] = slug
+            if len(domains) >= max_entries:
+                logger.warning(
+                    f"Custom domain map is full at {max_entries} entries; "
+                    "further domains are not routed."
+                )
+                break
+        self._domains = domains
+        self._version = version
+
+    def resolve(self, host):
+        now = time.monotonic()
+        if self._domains is None or (
+            now - self._checked_at > settings.CUSTOM_DOMAIN_CHECK_INTERVAL
+        ):
+            with self._lock:
+                if self._domains is None or (
+                    now - self._checked_at > settings.CUSTOM_DOMAIN_CHECK_INTERVAL
+                ):
+                    version = cache.get(VERSION_CACHE_KEY)
+                    if self._domains is None or version != self._version:
+                        self._load(version)
+                    self._checked_at = now
+        return self._domains.get(host)
+
+
+domain_map = DomainMap()
@@ -0,0 +1,25 @@
+from django.http.request import split_domain_port
+
+from .domains import domain_map
+from .views import PublicPortfolioView
+
+
+class CustomDomainMiddleware:
+    """
+    Serve the public portfolio at the root of a portfolio's custom domain.
+    Other paths and hosts pass through untouched.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.portfolio_view = PublicPortfolioView.as_view()
+
+    def __call__(self, request):
+        if request.path_info == "/":
+            # get_host() enforces ALLOWED_HOSTS, raising DisallowedHost for
+            # hosts that are not served, before the host picks a portfolio.
+            host, _ = split_domain_port(request.get_host())
+            slug = domain_map.resolve(host) if host else None
+            if slug:
+                return self.portfolio_view(request, slug=slug)
+        return self.get_response(request)
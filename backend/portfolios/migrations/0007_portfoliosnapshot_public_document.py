@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-19 09:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("portfolios", "0006_portfoliosnapshot"),
+    ]
+
+    operations = [
+        # Existing snapshots predate the public projection; dropping them
+        # makes every portfolio rebuild both documents on its next read.
+        migrations.RunSQL(
+            "DELETE FROM portfolios_portfoliosnapshot", migrations.RunSQL.noop
+        ),
+        migrations.AddField(
+            model_name="portfoliosnapshot",
+            name="public_document",
+            field=models.BinaryField(default=b""),
+        ),
+        migrations.AddField(
+            model_name="portfoliosnapshot",
+            name="public_version",
+            field=models.CharField(default="", max_length=64),
+        ),
+    ]
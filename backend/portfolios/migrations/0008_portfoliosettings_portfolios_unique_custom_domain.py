@@ -0,0 +1,39 @@
+# Generated by Django 6.0.1 on 2026-10-19 09:40
+
+from django.db import migrations, models
+
+
+def clear_duplicate_domains(apps, schema_editor):
+    # The earliest portfolio keeps a domain claimed more than once.
+    PortfolioSettings = apps.get_model("portfolios", "PortfolioSettings")
+    seen = set()
+    duplicates = []
+    rows = (
+        PortfolioSettings.objects.exclude(custom_domain__isnull=True)
+        .exclude(custom_domain="")
+        .order_by("pk")
+        .values_list("pk", "custom_domain")
+    )
+    for pk, custom_domain in rows:
+        if custom_domain in seen:
+            duplicates.append(pk)
+        seen.add(custom_domain)
+    PortfolioSettings.objects.filter(pk__in=duplicates).update(custom_domain=None)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("portfolios", "0007_portfoliosnapshot_public_document"),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_duplicate_domains, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="portfoliosettings",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("custom_domain", ""), _negated=True),
+                fields=("custom_domain",),
+                name="portfolios_unique_custom_domain",
+            ),
+        ),
+    ]
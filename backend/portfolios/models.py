@@ -71,6 +71,14 @@ class PortfolioSettings(models.Model):
         indexes = [
             models.Index(fields=["slug"]),
         ]
+        constraints = [
+            # A domain routes to a single portfolio.
+            models.UniqueConstraint(
+                fields=["custom_domain"],
+                condition=~models.Q(custom_domain=""),
+                name="portfolios_unique_custom_domain",
+            ),
+        ]
 
 
 class SocialLinks(models.Model):
@@ -190,3 +198,27 @@ class Skill(models.Model):
 
     def __str__(self):
         return f"{self.user.get_username() or self.user.email} - {self.name}"
+
+
+class PortfolioSnapshot(models.Model):
+    """
+    The complete portfolio response of a user, rendered ahead of time. Rebuilt
+    or dropped whenever data it contains changes; see portfolios.snapshots.
+    """
+
+    user = models.OneToOneField(
+        "authentication.User",
+        on_delete=models.CASCADE,
+        related_name="portfolio_snapshot",
+    )
+    # Rendered JSON body and a hash of it, for the owner and for visitors.
+    document = models.BinaryField()
+    version = models.CharField(max_length=64)
+    public_document = models.BinaryField(default=b"")
+    public_version = models.CharField(max_length=64, default="")
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return (
+            f"{self.user.get_username() or self.user.email} - Snapshot {self.version}"
+        )
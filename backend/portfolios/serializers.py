@@ -1,7 +1,9 @@
 from rest_framework import serializers
 
+from github_integration.serializers import LanguageBreakdownSerializer
 from themes.models import Theme, ThemeConfig
 
+from .domains import normalize_domain
 from .models import PortfolioSection, PortfolioSettings, Skill, SocialLinks
 
 
@@ -33,6 +35,22 @@ class PortfolioSettingSerializer(serializers.ModelSerializer):
         model = PortfolioSettings
         exclude = ("user",)
 
+    def validate_custom_domain(self, value):
+        host = normalize_domain(value)
+        if not host:
+            return value
+        # Stored values may differ in scheme, port or path; the host match
+        # narrows the candidates before they are compared exactly.
+        others = PortfolioSettings.objects.filter(custom_domain__icontains=host)
+        if self.instance is not None:
+            others = others.exclude(pk=self.instance.pk)
+        for custom_domain in others.values_list("custom_domain", flat=True):
+            if normalize_domain(custom_domain) == host:
+                raise serializers.ValidationError(
+                    "This domain is already used by another portfolio."
+                )
+        return value
+
     def update(self, instance, validated_data):
         config_data = validated_data.pop("theme_config", None)
 
@@ -75,3 +93,46 @@ class PortfolioResponseSerializer(serializers.Serializer):
     social_links = SocialLinksSerializer()
     skills = SkillSerializer(many=True)
     theme_config = PortfolioThemeConfigSerializer(allow_null=True, required=False)
+    languages = LanguageBreakdownSerializer(many=True)
+
+
+class PublicPortfolioSettingsSerializer(serializers.ModelSerializer):
+    """Settings as shown to visitors: no tracking ids or domain setup."""
+
+    class Meta:
+        model = PortfolioSettings
+        fields = (
+            "slug",
+            "show_github_stats",
+            "show_social_links",
+            "show_forked_repos",
+            "min_stars_to_show",
+            "show_contributions",
+            "show_recent_activity",
+            "show_projects",
+            "show_languages",
+            "layout_style",
+            "projects_per_page",
+            "enable_dark_mode",
+            "allow_contact_form",
+            "contact_email",
+            "resume_url",
+            "meta_title",
+            "meta_description",
+            "updated_at",
+        )
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if not instance.allow_contact_form:
+            data["contact_email"] = None
+        return data
+
+
+class PublicPortfolioResponseSerializer(serializers.Serializer):
+    settings = PublicPortfolioSettingsSerializer(allow_null=True)
+    sections = PortfolioSectionSerializer(many=True)
+    social_links = SocialLinksSerializer(allow_null=True)
+    skills = SkillSerializer(many=True)
+    theme_config = PortfolioThemeConfigSerializer(allow_null=True, required=False)
+    languages = LanguageBreakdownSerializer(many=True)
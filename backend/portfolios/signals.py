@@ -0,0 +1,125 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from github_integration.models import GithubProfile
+from github_integration.signals import (
+    profile_languages_changed,
+    sync_finished,
+    webhook_applied,
+)
+from themes.models import Theme, ThemeConfig
+
+from .domains import bump_domain_version
+from .models import PortfolioSection, PortfolioSettings, Skill, SocialLinks
+from .snapshots import build_snapshot, drop_slugs, drop_snapshots
+
+
+def _rebuild_on_commit(user_id):
+    transaction.on_commit(lambda: build_snapshot(user_id))
+
+
+@receiver([post_save, post_delete], sender=PortfolioSettings)
+@receiver([post_save, post_delete], sender=SocialLinks)
+@receiver([post_save, post_delete], sender=PortfolioSection)
+@receiver([post_save, post_delete], sender=Skill)
+def rebuild_user_snapshot(sender, instance, **kwargs):
+    _rebuild_on_commit(instance.user_id)
+
+
+@receiver(pre_save, sender=PortfolioSettings)
+def remember_previous_routing(sender, instance, **kwargs):
+    instance._previous_routing = (
+        PortfolioSettings.objects.filter(pk=instance.pk)
+        .values("slug", "custom_domain", "is_published")
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver([post_save, post_delete], sender=PortfolioSettings)
+def drop_settings_routing(sender, instance, **kwargs):
+    # Publishing, unpublishing or renaming changes what a slug resolves to,
+    # and what a custom domain routes to.
+    previous = getattr(instance, "_previous_routing", None) or {}
+    slugs = {instance.slug, previous.get("slug")}
+    transaction.on_commit(lambda: drop_slugs(slugs))
+
+    current = {
+        "slug": instance.slug,
+        "custom_domain": instance.custom_domain,
+        "is_published": instance.is_published,
+    }
+    deleted = kwargs.get("signal") is post_delete
+    if (instance.custom_domain or previous.get("custom_domain")) and (
+        deleted or current != previous
+    ):
+        transaction.on_commit(bump_domain_version)
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def drop_user_slugs(sender, instance, **kwargs):
+    # is_portfolio_public and is_active live on the user.
+    slugs = list(
+        PortfolioSettings.objects.filter(user_id=instance.pk).values_list(
+            "slug", flat=True
+        )
+    )
+    if slugs:
+        transaction.on_commit(lambda: drop_slugs(slugs))
+
+
+@receiver([post_save, post_delete], sender=ThemeConfig)
+def rebuild_theme_config_snapshot(sender, instance, **kwargs):
+    user_id = (
+        PortfolioSettings.objects.filter(pk=instance.settings_id)
+        .values_list("user_id", flat=True)
+        .first()
+    )
+    if user_id is not None:
+        _rebuild_on_commit(user_id)
+
+
+@receiver(post_save, sender=Theme)
+@receiver(pre_delete, sender=Theme)
+def drop_theme_snapshots(sender, instance, **kwargs):
+    # A theme can be applied by any number of users, so their snapshots are
+    # dropped and rebuilt on their next read rather than all at once.
+    user_ids = list(
+        ThemeConfig.objects.filter(theme=instance).values_list(
+            "settings__user_id", flat=True
+        )
+    )
+    if user_ids:
+        transaction.on_commit(lambda: drop_snapshots(user_ids))
+
+
+@receiver([post_save, post_delete], sender=GithubProfile)
+def drop_profile_snapshot(sender, instance, **kwargs):
+    # Disconnecting drops the languages; excluded_repos narrows the public
+    # language totals.
+    transaction.on_commit(lambda: drop_snapshots([instance.user_id]))
+
+
+@receiver(sync_finished)
+def drop_synced_snapshot(sender, user_id, sync_type, **kwargs):
+    # Repositories turning private or public change the public projection
+    # without touching any language totals.
+    if sync_type == "repositories":
+        drop_snapshots([user_id])
+
+
+@receiver(webhook_applied)
+def drop_webhook_snapshots(sender, user_ids, **kwargs):
+    # Stars, visibility and deletions arrive through webhooks between syncs.
+    drop_snapshots(user_ids)
+
+
+@receiver(profile_languages_changed)
+def drop_language_snapshot(sender, profile_id, **kwargs):
+    user_ids = GithubProfile.objects.filter(pk=profile_id).values_list(
+        "user_id", flat=True
+    )
+    drop_snapshots(user_ids)
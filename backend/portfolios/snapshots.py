@@ -0,0 +1,172 @@
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+
+from github_integration.languages import (
+    profile_language_breakdown,
+    public_language_breakdown,
+)
+from themes.models import ThemeConfig
+
+from .models import (
+    PortfolioSection,
+    PortfolioSettings,
+    PortfolioSnapshot,
+    Skill,
+    SocialLinks,
+)
+from .serializers import PortfolioResponseSerializer, PublicPortfolioResponseSerializer
+
+
+def snapshot_cache_key(user_id, public=False):
+    if public:
+        return f"portfolio_snapshot:public:{user_id}"
+    return f"portfolio_snapshot:{user_id}"
+
+
+def slug_cache_key(slug):
+    return f"portfolio_slug:{slug}"
+
+
+def render_portfolio(user_id):
+    """Render the complete portfolio of a user, as its owner sees it."""
+    portfolio_settings = PortfolioSettings.objects.filter(user_id=user_id).first()
+    show_languages = portfolio_settings is None or portfolio_settings.show_languages
+
+    data = {
+        "settings": portfolio_settings,
+        "sections": PortfolioSection.objects.filter(user_id=user_id).order_by("order"),
+        "social_links": SocialLinks.objects.filter(user_id=user_id).first(),
+        "skills": Skill.objects.filter(user_id=user_id).order_by("order"),
+        "theme_config": ThemeConfig.objects.filter(settings__user_id=user_id).first(),
+        "languages": profile_language_breakdown(user_id) if show_languages else [],
+    }
+    return JSONRenderer().render(PortfolioResponseSerializer(data).data)
+
+
+def render_public_portfolio(user_id):
+    """
+    Render the portfolio as visitors see it: disabled sections, hidden social
+    links, private settings and private or hidden repositories are left out.
+    """
+    portfolio_settings = PortfolioSettings.objects.filter(user_id=user_id).first()
+    show_social_links = (
+        portfolio_settings is None or portfolio_settings.show_social_links
+    )
+    show_languages = portfolio_settings is None or portfolio_settings.show_languages
+    include_forks = (
+        portfolio_settings is not None and portfolio_settings.show_forked_repos
+    )
+
+    data = {
+        "settings": portfolio_settings,
+        "sections": PortfolioSection.objects.filter(
+            user_id=user_id, is_enabled=True
+        ).order_by("order"),
+        "social_links": (
+            SocialLinks.objects.filter(user_id=user_id).first()
+            if show_social_links
+            else None
+        ),
+        "skills": Skill.objects.filter(user_id=user_id).order_by("order"),
+        "theme_config": ThemeConfig.objects.filter(settings__user_id=user_id).first(),
+        "languages": (
+            public_language_breakdown(user_id, include_forks=include_forks)
+            if show_languages
+            else []
+        ),
+    }
+    return JSONRenderer().render(PublicPortfolioResponseSerializer(data).data)
+
+
+def build_snapshot(user_id):
+    """
+    Render and store both of a user's documents. Returns ``{public:
+    (version, document)}``, or None when the user no longer exists.
+    """
+    if not get_user_model().objects.filter(pk=user_id).exists():
+        return None
+    documents = {
+        False: render_portfolio(user_id),
+        True: render_public_portfolio(user_id),
+    }
+    snapshots = {
+        public: (hashlib.sha256(document).hexdigest(), document)
+        for public, document in documents.items()
+    }
+    PortfolioSnapshot.objects.update_or_create(
+        user_id=user_id,
+        defaults={
+            "version": snapshots[False][0],
+            "document": snapshots[False][1],
+            "public_version": snapshots[True][0],
+            "public_document": snapshots[True][1],
+        },
+    )
+    for public, snapshot in snapshots.items():
+        cache.set(snapshot_cache_key(user_id, public), snapshot)
+    return snapshots
+
+
+def get_snapshot(user_id, public=False):
+    """
+    ``(version, document)`` of a user's portfolio, the visitors' projection
+    when ``public`` is set: from the cache, else the snapshot table, else
+    built now.
+    """
+    key = snapshot_cache_key(user_id, public)
+    snapshot = cache.get(key)
+    if snapshot is not None:
+        return snapshot
+
+    fields = (
+        ("public_version", "public_document") if public else ("version", "document")
+    )
+    row = PortfolioSnapshot.objects.filter(user_id=user_id).values_list(*fields).first()
+    if row is None:
+        snapshots = build_snapshot(user_id)
+        return snapshots[public] if snapshots else None
+    snapshot = (row[0], bytes(row[1]))
+    cache.set(key, snapshot)
+    return snapshot
+
+
+def drop_snapshots(user_ids):
+    """Discard snapshots so they are rebuilt on their next read."""
+    user_ids = list(user_ids)
+    PortfolioSnapshot.objects.filter(user_id__in=user_ids).delete()
+    cache.delete_many(
+        [
+            snapshot_cache_key(user_id, public)
+            for user_id in user_ids
+            for public in (False, True)
+        ]
+    )
+
+
+def resolve_public_slug(slug):
+    """
+    Id of the user whose published, public portfolio has this slug, or None.
+    Unknown slugs are cached too, so scans for them don't reach the database.
+    """
+    key = slug_cache_key(slug)
+    user_id = cache.get(key)
+    if user_id is None:
+        user_id = (
+            PortfolioSettings.objects.filter(
+                slug=slug,
+                is_published=True,
+                user__is_portfolio_public=True,
+                user__is_active=True,
+            )
+            .values_list("user_id", flat=True)
+            .first()
+        ) or 0
+        cache.set(key, user_id)
+    return user_id or None
+
+
+def drop_slugs(slugs):
+    cache.delete_many([slug_cache_key(slug) for slug in slugs if slug])
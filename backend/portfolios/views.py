@@ -1,19 +1,23 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
 from drf_spectacular.utils import extend_schema
-from rest_framework.response import Response
+from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 
 from core.views import SingletonUserView
-from themes.models import ThemeConfig
 
 from .models import PortfolioSection, PortfolioSettings, Skill, SocialLinks
 from .serializers import (
     PortfolioResponseSerializer,
     PortfolioSectionSerializer,
     PortfolioSettingSerializer,
+    PublicPortfolioResponseSerializer,
     SkillSerializer,
     SocialLinksSerializer,
 )
+from .snapshots import get_snapshot, resolve_public_slug
 
 
 @extend_schema(tags=["Portfolio Settings"])
@@ -51,13 +55,55 @@ class CompletePortfolioView(APIView):
     serializer_class = PortfolioResponseSerializer
 
     def get(self, request):
-        user = request.user
-        data = {
-            "settings": PortfolioSettings.objects.filter(user=user).first(),
-            "sections": PortfolioSection.objects.filter(user=user).order_by("order"),
-            "social_links": SocialLinks.objects.filter(user=user).first(),
-            "skills": Skill.objects.filter(user=user).order_by("order"),
-            "theme_config": ThemeConfig.objects.filter(settings__user=user).first(),
+        # Served from the prebuilt snapshot: no per-request queries or
+        # serialization beyond fetching it.
+        _, document = get_snapshot(request.user.pk)
+        return HttpResponse(document, content_type="application/json")
+
+
+@extend_schema(tags=["Complete Portfolio"])
+class PublicPortfolioView(APIView):
+    """
+    Anonymous read of a published portfolio, built for CDN caching. Serves
+    the snapshot's public projection; the ETag is that projection's content
+    hash, so a matching If-None-Match is answered with 304 from the cached
+    version alone.
+    """
+
+    serializer_class = PublicPortfolioResponseSerializer
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    throttle_classes = []
+
+    @extend_schema(
+        summary="Public Portfolio",
+        description="Published portfolio by slug. Supports conditional GET via If-None-Match.",
+        responses={200: PublicPortfolioResponseSerializer, 304: None, 404: None},
+    )
+    def get(self, request, slug):
+        user_id = resolve_public_slug(slug)
+        if user_id is None:
+            raise Http404("Portfolio not found")
+        snapshot = get_snapshot(user_id, public=True)
+        if snapshot is None:
+            raise Http404("Portfolio not found")
+        version, document = snapshot
+
+        etag = f'"{version}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": (
+                f"public, max-age={settings.PUBLIC_PORTFOLIO_MAX_AGE}, "
+                "stale-while-revalidate="
+                f"{settings.PUBLIC_PORTFOLIO_STALE_WHILE_REVALIDATE}"
+            ),
+        }
+        # Weak comparison (RFC 9110 13.1.2): proxies that re-encode the body
+        # send the tag back as W/"...".
+        if_none_match = {
+            tag.removeprefix("W/")
+            for tag in parse_etags(request.headers.get("If-None-Match", ""))
         }
-        serializer = PortfolioResponseSerializer(data)
-        return Response(serializer.data)
+        if "*" in if_none_match or etag in if_none_match:
+            return HttpResponseNotModified(headers=headers)
+        return HttpResponse(document, content_type="application/json", headers=headers)